@@ -0,0 +1,54 @@
+from PySide6.QtCore import Slot, QRectF
+import pyqtgraph as pg
+
+
+class AbsorptionMapWidget(pg.GraphicsLayoutWidget):
+    def __init__(self, parent = None):
+        pg.GraphicsLayoutWidget.__init__(self, parent)
+
+        self.map = self.addPlot(0, 0)
+
+        self.title = 'Excitonic Absorption Map'
+        self.map.setTitle(self.title)
+
+        self.map.showAxes(True)
+
+        self.xLabel = 'Q-Path'
+        self.yLabel = 'Energy'
+
+        self.xUnits = None
+        self.yUnits = 'eV'
+
+        self.map.setLabel('bottom', text = self.xLabel, units = self.xUnits)
+        self.map.setLabel('left', text = self.yLabel, units = self.yUnits)
+
+        self.imageItem = pg.ImageItem(axisOrder = 'col-major')
+        self.map.addItem(self.imageItem)
+
+        # Colors and levels are changed here without recomputing the map
+        self.histogram = pg.HistogramLUTItem()
+        self.histogram.setImageItem(self.imageItem)
+        self.histogram.gradient.loadPreset('inferno')
+        self.addItem(self.histogram, 0, 1)
+
+        self.hasImage = False
+
+    @Slot()
+    def plotData(self, image, xRange, yRange):
+        self.imageItem.setImage(image, autoLevels = not self.hasImage)
+        self.imageItem.setRect(QRectF(xRange[0], yRange[0], xRange[1] - xRange[0], yRange[1] - yRange[0]))
+        self.imageItem.show()
+
+        self.hasImage = True
+
+    @Slot()
+    def clearData(self):
+        self.imageItem.clear()
+        self.imageItem.hide()
+
+        self.hasImage = False
+
+    @Slot()
+    def setXAxis(self, x, labels):
+        self.map.getAxis('bottom').setTicks([list(zip(x, labels))])
+        self.map.getAxis('bottom').setGrid(128)
@@ -1,4 +1,5 @@
 from PySide6.QtCore import Signal, Slot, Qt
+from item_pool import ItemPool, Same, sameValue, penKey
 import pyqtgraph as pg
 
 
@@ -30,7 +31,12 @@ class AbsorptionWidget(pg.GraphicsLayoutWidget):
 
         self.excitonsLayout = self.addLayout(1, 0)
 
-        self.excitonPlots = []
+        # Exciton strip plots by q, reused when curves are pinned and unpinned
+        self.excitonPlots = {}
+        self.excitonPlotKeys = []
+        self.excitonPlotStates = {}
+        self.excitonBars = {}
+        self.freeExcitonPlots = []
 
         self.ci.layout.setRowStretchFactor(0, 7)
         self.ci.layout.setRowStretchFactor(1, 1)
@@ -50,65 +56,147 @@ class AbsorptionWidget(pg.GraphicsLayoutWidget):
 
         self.style.axesStyle.axesWidthChanged.connect(self.setAxesWidth)
 
-        self.curveItems = []
+        # Items are kept between replots and only updated when their data or style change
+        self.curvePool = ItemPool(self.absorption, self.newCurveItem)
+        self.pointPool = ItemPool(self.absorption, self.newScatterItem)
+        self.labelPool = ItemPool(self.absorption, self.newLabelItem)
+
+        self.curveKeys = []
+        self.legendState = []
+
+    def newCurveItem(self):
+        dataItem = pg.PlotDataItem(symbol = None)
+        dataItem.curve.setClickable(True)
+        dataItem.sigClicked.connect(self.curveSelected)
+        return dataItem
+
+    def newScatterItem(self):
+        scatterPlotItem = pg.ScatterPlotItem()
+        scatterPlotItem.sigClicked.connect(self.getSelectedExcitons)
+        return scatterPlotItem
+
+    def newLabelItem(self):
+        return pg.TextItem(anchor = (0.5, 1.0))
+
+    def newExcitonPlot(self):
+        if len(self.freeExcitonPlots) > 0:
+            return self.freeExcitonPlots.pop()
+
+        plot = pg.PlotItem()
+        plot.setXLink(self.absorption)
+        plot.showAxes(False)
+        plot.hideButtons()
+        return plot
+
+    def setCurveData(self, dataItem, x, y, pen):
+        dataItem.setData(x, y)
+        dataItem.setPen(pen)
+
+    def setLabel(self, textItem, text, x, y):
+        textItem.setText(text)
+        textItem.setPos(x, y)
 
     @Slot()
     def plotData(self, excAbsData, showLabels):
-        self.absorption.clear()
-        self.curveItems.clear()
-
-        for plot in self.excitonPlots:
-            self.excitonsLayout.removeItem(plot)
-
-        self.excitonPlots.clear()
-
-        if len(excAbsData) > 0:
-            # Line graphs with absorption
-
-            curvePens = self.style.curveStyle.curvePens
-            pointSymbols = self.style.pointStyle.pointSymbols
-            pointSizes = self.style.pointStyle.pointSizes
-
-            for i, data in enumerate(excAbsData):
-                dataItem = pg.PlotDataItem(data['energy'], data['absorption'], symbol = None, pen = curvePens[i], name = "q = %d"%(data['q']))
-                dataItem.curve.setClickable(True)
-                dataItem.sigClicked.connect(self.curveSelected)
-
-                self.absorption.addItem(dataItem)
-                self.curveItems.append(dataItem)
-
-                scatterPlotItem = pg.ScatterPlotItem(x = data['brightExcEnergy'], y = data['brightExcAbsorption'], data = data['data'], symbol = pointSymbols[i], size = pointSizes[i])
-                scatterPlotItem.sigClicked.connect(self.getSelectedExcitons)
-                self.absorption.addItem(scatterPlotItem)
-
-                if showLabels:
-                    for i in range(len(data['brightExcIndices'])):
-                        textItem = pg.TextItem("(%d, %.3f)"%(data['brightExcIndices'][i], data['brightExcIntensities'][i]), anchor = (0.5, 1.0))
-                        textItem.setPos(data['brightExcEnergy'][i], data['brightExcAbsorption'][i])
-                        self.absorption.addItem(textItem)
-
-            # Bar graphs with excitons
-            for i, data in enumerate(excAbsData):
-                row = i + 1
-                plot = self.excitonsLayout.addPlot(row, 0)
-                plot.setXLink(self.absorption)
-                plot.showAxes(False)
-                plot.hideButtons()
-                plot.addItem(pg.BarGraphItem(x = data['brightExcEnergy'], width = 0.00001, height = 1.0, pen = curvePens[i].color(), brush = curvePens[i].color()))
-                plot.addItem(pg.BarGraphItem(x = data['darkExcEnergy'], width = 0.00001, height = 1.0, pen = 'gray', brush = 'gray'))
-                self.excitonPlots.append(plot)
-        else:
+        curvePens = self.style.curveStyle.curvePens
+        pointSymbols = self.style.pointStyle.pointSymbols
+        pointSizes = self.style.pointStyle.pointSizes
+
+        self.curveKeys = [data['q'] for data in excAbsData]
+
+        # Line graphs with absorption
+
+        self.curvePool.begin()
+        self.pointPool.begin()
+        self.labelPool.begin()
+
+        for i, data in enumerate(excAbsData):
+            q = data['q']
+
+            self.curvePool.update(('curve', q), (data['energy'], data['absorption'], penKey(curvePens[i])), lambda item, data=data, i=i: self.setCurveData(item, data['energy'], data['absorption'], curvePens[i]))
+
+            self.pointPool.update(('points', q), (data['brightExcEnergy'], data['brightExcAbsorption'], Same(data['data']), pointSymbols[i], pointSizes[i]), lambda item, data=data, i=i: item.setData(x = data['brightExcEnergy'], y = data['brightExcAbsorption'], data = data['data'], symbol = pointSymbols[i], size = pointSizes[i]))
+
+            if showLabels:
+                for k in range(len(data['brightExcIndices'])):
+                    text = "(%d, %.3f)"%(data['brightExcIndices'][k], data['brightExcIntensities'][k])
+                    x = data['brightExcEnergy'][k]
+                    y = data['brightExcAbsorption'][k]
+                    self.labelPool.update(('label', q, k), (text, x, y), lambda item, text=text, x=x, y=y: self.setLabel(item, text, x, y))
+
+        self.curvePool.end()
+        self.pointPool.end()
+        self.labelPool.end()
+
+        legendState = [(q, "q = %d"%(q)) for q in self.curveKeys]
+        if legendState != self.legendState:
+            self.legend.clear()
+            for q, name in legendState:
+                self.legend.addItem(self.curvePool.items[('curve', q)], name)
+            self.legendState = legendState
+
+        # Bar graphs with excitons
+
+        self.updateExcitonPlots(excAbsData, curvePens)
+
+        if len(excAbsData) == 0:
             self.absorption.setRange(xRange = (0.0, 1.0), yRange = (0.0, 1.0), disableAutoRange = False)
 
+    def updateExcitonPlots(self, excAbsData, curvePens):
+        keys = [data['q'] for data in excAbsData]
+
+        if keys != self.excitonPlotKeys:
+            for q in self.excitonPlotKeys:
+                self.excitonsLayout.removeItem(self.excitonPlots[q])
+
+            for q in list(self.excitonPlots.keys()):
+                if q not in keys:
+                    self.freeExcitonPlots.append(self.excitonPlots.pop(q))
+                    self.excitonPlotStates.pop(q, None)
+
+            for row, q in enumerate(keys):
+                if q not in self.excitonPlots:
+                    self.excitonPlots[q] = self.newExcitonPlot()
+                self.excitonsLayout.addItem(self.excitonPlots[q], row + 1, 0)
+
+            self.excitonPlotKeys = keys
+
+        for i, data in enumerate(excAbsData):
+            q = data['q']
+            state = (data['brightExcEnergy'], data['darkExcEnergy'], penKey(curvePens[i]))
+
+            if sameValue(self.excitonPlotStates.get(q), state):
+                continue
+
+            plot = self.excitonPlots[q]
+            color = curvePens[i].color()
+
+            if plot not in self.excitonBars:
+                brightBars = pg.BarGraphItem(x = data['brightExcEnergy'], width = 0.00001, height = 1.0, pen = color, brush = color)
+                darkBars = pg.BarGraphItem(x = data['darkExcEnergy'], width = 0.00001, height = 1.0, pen = 'gray', brush = 'gray')
+                plot.addItem(brightBars)
+                plot.addItem(darkBars)
+                self.excitonBars[plot] = (brightBars, darkBars)
+            else:
+                brightBars, darkBars = self.excitonBars[plot]
+                brightBars.setOpts(x = data['brightExcEnergy'], pen = color, brush = color)
+                darkBars.setOpts(x = data['darkExcEnergy'])
+
+            self.excitonPlotStates[q] = state
+
     @Slot()
     def clearData(self):
-        self.absorption.clear()
-        self.absorption.setRange(xRange = (0.0, 1.0), yRange = (0.0, 1.0), disableAutoRange = False)
+        self.curvePool.releaseAll()
+        self.pointPool.releaseAll()
+        self.labelPool.releaseAll()
 
-        for plot in self.excitonPlots:
-            self.excitonsLayout.removeItem(plot)
+        self.legend.clear()
+        self.legendState = []
+        self.curveKeys = []
+
+        self.absorption.setRange(xRange = (0.0, 1.0), yRange = (0.0, 1.0), disableAutoRange = False)
 
-        self.excitonPlots.clear()
+        self.updateExcitonPlots([], [])
 
     @Slot()
     def getSelectedExcitons(self, item, points, ev):
@@ -116,7 +204,9 @@ class AbsorptionWidget(pg.GraphicsLayoutWidget):
 
     @Slot()
     def curveSelected(self, item, ev):
-        self.curveClicked.emit(self.curveItems.index(item))
+        key = self.curvePool.keyOf(item)
+        if key is not None:
+            self.curveClicked.emit(self.curveKeys.index(key[1]))
 
     @Slot()
     def setAxesColor(self, color):
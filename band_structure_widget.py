@@ -1,5 +1,8 @@
 from PySide6.QtCore import Signal, Slot, Qt
+from PySide6.QtWidgets import QGraphicsPathItem
+from item_pool import ItemPool, penKey
 import pyqtgraph as pg
+import numpy as np
 
 
 class BandStructureWidget(pg.PlotWidget):
@@ -36,51 +39,151 @@ class BandStructureWidget(pg.PlotWidget):
 
         self.style.axesStyle.axesWidthChanged.connect(self.setAxesWidth)
 
-        self.dataItemHighs = []
-        self.dataItemLows = []
+        # All bands are drawn with a single fill item and one outline item per distinct pen
+        self.fillItem = QGraphicsPathItem()
+        self.fillItem.setPen(pg.mkPen(None))
+        self.fillItem.hide()
+        self.addItem(self.fillItem)
+
+        self.outlinePool = ItemPool(self, self.newOutlineItem)
+        self.outlineItems = []
+        self.outlineBands = []
+
+        # Geometry buffers, updated in place when only the weight factor changes
+        self.bandX = np.zeros(0)
+        self.bandY = np.zeros((0, 0))
+        self.bandWeights = np.zeros((0, 0))
+        self.scaledWeights = np.zeros((0, 0))
+        self.bandHighs = np.zeros((0, 0))
+        self.bandLows = np.zeros((0, 0))
+
+        self.fillX = np.zeros(0)
+        self.fillY = np.zeros((0, 0))
+        self.fillConnect = np.zeros(0, dtype = bool)
+
+        self.outlineX = []
+        self.outlineY = []
+        self.outlineConnect = []
+
+    def newOutlineItem(self):
+        outlineItem = pg.PlotCurveItem()
+        outlineItem.setClickable(True)
+        outlineItem.sigClicked.connect(self.curveSelected)
+        return outlineItem
 
     @Slot()
     def plotData(self, x, y, w):
-        self.clear()
-        self.dataItemHighs.clear()
-        self.dataItemLows.clear()
+        self.outlineItems.clear()
+        self.outlineBands.clear()
+        self.outlineX.clear()
+        self.outlineY.clear()
+        self.outlineConnect.clear()
 
-        yMin = []
-        yMax = []
+        if len(w) == 0:
+            self.fillItem.hide()
+            self.outlinePool.releaseAll()
+            return
+
+        self.bandX = np.ascontiguousarray(x)
+        self.bandY = np.ascontiguousarray(y)
+        self.bandWeights = np.ascontiguousarray(w)
+
+        nBands, nPoints = self.bandY.shape
+
+        self.scaledWeights = np.empty_like(self.bandWeights)
+        self.bandHighs = np.empty_like(self.bandY)
+        self.bandLows = np.empty_like(self.bandY)
+
+        # Fill: one closed polygon per band, upper edge forwards and lower edge backwards
+
+        self.fillX = np.tile(np.concatenate((self.bandX, self.bandX[::-1])), nBands)
+        self.fillY = np.empty((nBands, 2 * nPoints), dtype = self.bandY.dtype)
+
+        fillConnect = np.ones((nBands, 2 * nPoints), dtype = bool)
+        fillConnect[:, -1] = False
+        self.fillConnect = fillConnect.ravel()
+
+        self.fillItem.setBrush(self.style.brush)
+        self.fillItem.show()
+
+        # Outlines: upper and lower edges of all bands sharing a pen in one multi-segment curve
 
         curvePens = self.style.curveStyle.curvePens
 
-        for i in range(len(w)):
-            dataItemHigh = pg.PlotDataItem(x, y[i] + w[i], pen = curvePens[i], symbol = None)
-            dataItemHigh.curve.setClickable(True)
-            dataItemHigh.sigClicked.connect(self.curveSelected)
+        penGroups = {}
+        for i in range(nBands):
+            penGroups.setdefault(penKey(curvePens[i]), []).append(i)
+
+        self.outlinePool.begin()
+
+        for key, bands in penGroups.items():
+            bands = np.array(bands)
+
+            outlineConnect = np.ones((2 * len(bands), nPoints), dtype = bool)
+            outlineConnect[:, -1] = False
 
-            dataItemLow = pg.PlotDataItem(x, y[i] - w[i], pen = curvePens[i], symbol = None)
-            dataItemLow.curve.setClickable(True)
-            dataItemLow.sigClicked.connect(self.curveSelected)
+            pen = curvePens[bands[0]]
+            outlineItem = self.outlinePool.update(('outline', key), key, lambda item, pen=pen: item.setPen(pen))
 
-            fillBetweenItem = pg.FillBetweenItem(curve1 = dataItemHigh, curve2 = dataItemLow, pen = None, brush = self.style.brush)
+            self.outlineItems.append(outlineItem)
+            self.outlineBands.append(bands)
+            self.outlineX.append(np.tile(self.bandX, 2 * len(bands)))
+            self.outlineY.append(np.empty((len(bands), 2, nPoints), dtype = self.bandY.dtype))
+            self.outlineConnect.append(outlineConnect.ravel())
 
-            self.addItem(fillBetweenItem)
-            self.addItem(dataItemHigh)
-            self.addItem(dataItemLow)
+        self.outlinePool.end()
 
-            self.dataItemHighs.append(dataItemHigh)
-            self.dataItemLows.append(dataItemLow)
+        self.updateBandGeometry()
 
-            yMin.append(min(y[i]))
-            yMax.append(max(y[i]))
+    def updateBandGeometry(self):
+        np.multiply(self.bandWeights, self.style.weightFactor, out = self.scaledWeights)
+        np.add(self.bandY, self.scaledWeights, out = self.bandHighs)
+        np.subtract(self.bandY, self.scaledWeights, out = self.bandLows)
+
+        nPoints = self.bandY.shape[1]
+
+        self.fillY[:, :nPoints] = self.bandHighs
+        self.fillY[:, nPoints:] = self.bandLows[:, ::-1]
+
+        fillPath = pg.arrayToQPath(self.fillX, self.fillY.ravel(), self.fillConnect)
+        fillPath.setFillRule(Qt.FillRule.WindingFill)
+        self.fillItem.setPath(fillPath)
+
+        for outlineItem, bands, outlineX, outlineY, outlineConnect in zip(self.outlineItems, self.outlineBands, self.outlineX, self.outlineY, self.outlineConnect):
+            np.take(self.bandHighs, bands, axis = 0, out = outlineY[:, 0], mode = 'clip')
+            np.take(self.bandLows, bands, axis = 0, out = outlineY[:, 1], mode = 'clip')
+            outlineItem.setData(outlineX, outlineY.ravel(), connect = outlineConnect)
+
+    @Slot()
+    def setWeightFactor(self, factor):
+        if len(self.outlineItems) > 0:
+            self.updateBandGeometry()
 
     @Slot()
     def curveSelected(self, item, ev):
-        if item in self.dataItemHighs:
-            self.curveClicked.emit(self.dataItemHighs.index(item))
-        elif item in self.dataItemLows:
-            self.curveClicked.emit(self.dataItemLows.index(item))
+        if item not in self.outlineItems:
+            return
+
+        bands = self.outlineBands[self.outlineItems.index(item)]
+
+        pos = ev.pos()
+
+        # Band whose upper or lower edge passes closest to the click
+        highs = np.array([np.interp(pos.x(), self.bandX, self.bandHighs[i]) for i in bands])
+        lows = np.array([np.interp(pos.x(), self.bandX, self.bandLows[i]) for i in bands])
+        distances = np.minimum(np.abs(highs - pos.y()), np.abs(lows - pos.y()))
+
+        self.curveClicked.emit(int(bands[np.argmin(distances)]))
 
     @Slot()
     def clearData(self):
-        self.clear()
+        self.fillItem.hide()
+        self.outlinePool.releaseAll()
+        self.outlineItems.clear()
+        self.outlineBands.clear()
+        self.outlineX.clear()
+        self.outlineY.clear()
+        self.outlineConnect.clear()
         self.setRange(xRange = (self.xMin, self.xMax), yRange = (-1.0, -1.0), disableAutoRange = False)
 
     @Slot()
@@ -0,0 +1,88 @@
+from scipy.optimize import linear_sum_assignment
+import numpy as np
+
+
+
+def transitionKeys(table, bounds):
+    # One integer per row (k, v, c, ...) of a BSE table, comparable between tables sharing bounds
+    keys = np.zeros(len(table), dtype = np.int64)
+    for column, bound in zip(table.T, bounds):
+        keys = keys * bound + column
+    return keys
+
+
+
+def overlapMatrix(table1, vectors1, table2, vectors2, chunk = 1 << 16):
+    # |<A1_i|A2_j>|^2 over the transitions both Q-points share, accumulated over chunks of transitions
+    bounds = np.maximum(table1.max(axis = 0), table2.max(axis = 0)) + 1
+
+    common, indices1, indices2 = np.intersect1d(transitionKeys(table1, bounds), transitionKeys(table2, bounds), assume_unique = True, return_indices = True)
+
+    overlaps = np.zeros((len(vectors1), len(vectors2)), dtype = np.result_type(vectors1, vectors2))
+
+    for start in range(0, len(common), chunk):
+        overlaps += vectors1[:, indices1[start:start + chunk]] @ vectors2[:, indices2[start:start + chunk]].conj().T
+
+    return np.abs(overlaps) ** 2
+
+
+
+def pathSequence(qIndices):
+    # Q-points in the order the path visits them, repeated visits to the same one in a row merged
+    qIndices = np.asarray(qIndices, dtype = int)
+    if len(qIndices) == 0:
+        return qIndices
+    return qIndices[np.r_[True, qIndices[1:] != qIndices[:-1]]]
+
+
+
+def meshPairs(root, qIndices, carPoints, rlat):
+    # Steps reaching every loaded Q-point from root, each from its closest Q-point already reached (Prim's algorithm)
+    qIndices = np.asarray(qIndices, dtype = int)
+    carPoints = np.asarray(carPoints, dtype = np.float64).reshape(-1, 3)
+
+    if len(qIndices) == 0:
+        return []
+
+    # Only periodic images: the transition tables of Q-points related by another symmetry are written in rotated frames, so their overlaps mean nothing
+    shifts = np.array(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing = 'ij')).reshape(3, -1).T @ np.asarray(rlat, dtype = np.float64)
+
+    distances = np.full(len(qIndices), np.inf)
+    parents = np.full(len(qIndices), -1)
+    remaining = qIndices != root
+
+    pairs = []
+    newlyReached = int(np.flatnonzero(qIndices == root)[0])
+
+    while remaining.any():
+        candidates = np.flatnonzero(remaining)
+
+        d = np.min(np.linalg.norm(carPoints[candidates, np.newaxis, :] - (carPoints[newlyReached] + shifts)[np.newaxis, :, :], axis = 2), axis = 1)
+        closer = d < distances[candidates]
+        distances[candidates[closer]] = d[closer]
+        parents[candidates[closer]] = newlyReached
+
+        nearest = candidates[np.argmin(distances[candidates])]
+        remaining[nearest] = False
+
+        pairs.append((int(qIndices[parents[nearest]]), int(qIndices[nearest])))
+        newlyReached = nearest
+
+    return pairs
+
+
+
+def trackPermutations(root, pairs, overlaps, numStates):
+    # For each Q-point, the state that continues every curve, following the largest total overlap at each step
+    permutations = {}
+
+    if root is None:
+        return permutations
+
+    permutations[int(root)] = np.arange(numStates)
+
+    for a, b in pairs:
+        rows, columns = linear_sum_assignment(overlaps[(a, b)], maximize = True)
+        permutations[b] = columns[permutations[a]]
+
+    return permutations
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+import numpy as np
+
+
+
+def byteSize(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    elif isinstance(value, dict):
+        return sum(byteSize(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        return sum(byteSize(item) for item in value)
+    return 0
+
+
+
+class LRUCache:
+    def __init__(self, name, maxBytes):
+        self.name = name
+        self.maxBytes = maxBytes
+
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
+
+        # Cost of recomputing each entry and its credit in the shared memory budget, if any
+        self.costs = {}
+        self.credits = {}
+        self.budget = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default = None):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            self.credit(key)
+            return self.entries[key]
+
+        self.misses += 1
+        return default
+
+    def put(self, key, value, nbytes = None, cost = 1.0):
+        if key in self.entries:
+            self.pop(key)
+
+        if nbytes is None:
+            nbytes = byteSize(value)
+
+        self.entries[key] = value
+        self.sizes[key] = nbytes
+        self.nbytes += nbytes
+
+        self.costs[key] = cost
+        self.credit(key)
+
+        self.evict(self.maxBytes)
+
+        if self.budget is not None:
+            self.budget.enforce((self, key))
+
+    def credit(self, key):
+        # Cheap to recompute, large entries go first, older ones before recently used ones
+        clock = self.budget.clock if self.budget is not None else 0.0
+        self.credits[key] = clock + self.costs[key] / max(self.sizes[key], 1)
+
+    def lowestCredit(self, keep = None):
+        keys = [key for key in self.entries if key != keep]
+        if len(keys) == 0:
+            return None, None
+
+        key = min(keys, key = self.credits.__getitem__)
+        return key, self.credits[key]
+
+    def pop(self, key, default = None):
+        if key not in self.entries:
+            return default
+
+        self.nbytes -= self.sizes.pop(key)
+        self.costs.pop(key)
+        self.credits.pop(key)
+
+        value = self.entries.pop(key)
+
+        if self.budget is not None:
+            self.budget.usageChanged.emit()
+
+        return value
+
+    def evict(self, maxBytes):
+        # The most recently used entry is always kept
+        while self.nbytes > maxBytes and len(self.entries) > 1:
+            key = next(iter(self.entries))
+            self.pop(key)
+
+    def removeIf(self, predicate):
+        for key in [key for key in self.entries if predicate(key)]:
+            self.pop(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.sizes.clear()
+        self.costs.clear()
+        self.credits.clear()
+        self.nbytes = 0
+
+        if self.budget is not None:
+            self.budget.usageChanged.emit()
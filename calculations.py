@@ -1,8 +1,28 @@
-from PySide6.QtCore import QObject, Signal, Slot
-from yambopy import YamboLatticeDB, ExcitonDispersion, YamboExcitonDB, YamboBSEAbsorptionSpectra, YamboQPDB
-from yambopy.lattice import calculate_distances, red_car
+from PySide6.QtCore import QObject, Signal, Slot, QThreadPool, QTimer
+from yambopy import YamboLatticeDB, YamboExcitonDB, YamboBSEAbsorptionSpectra, YamboQPDB
+from yambopy.lattice import calculate_distances, red_car, car_red
 from yambopy.tools.skw import SkwInterpolator
+from yambopy.units import ha2ev
+from netCDF4 import Dataset
+from workers import Worker, StreamWorker
+from scheduler import JobScheduler
+from cache import LRUCache
+from memory import MemoryBudget
+from spectra import broadenSpectrum
+from exciton_dos import gridShape, skwArrays, streamHistogram
+from energy_map import MAP_PLANES, planeBasis, pixelTransform, streamEnergyMap
+from extrema import pathExtrema, effectiveMass
+from exciton_weights import complexArray, kWeights
+from exciton_search import buildIndex, parseQuery, searchIndex
+from band_tracking import overlapMatrix, pathSequence, meshPairs, trackPermutations
+from projection import CollinearProjector, expandBySymmetry
+from path_sampling import refinePath, pathKPoints
+from functools import partial
+from collections import Counter
+from scipy.spatial import cKDTree
 import numpy as np
+import os
+from time import perf_counter
 
 
 
@@ -13,6 +33,30 @@ class PointData:
 
 
 
+class FiniteQExcitonDB(YamboExcitonDB):
+    # At finite Q the hole of transition (k, v, c) sits at k-Q and the electron at k
+    kMinusQ = None
+
+    def get_exciton_weights(self, excitons):
+        weights = np.zeros([self.nkpoints, self.mband])
+
+        k, v, c = np.transpose(self.table[:, 0:3] - 1)
+        kv = k if self.kMinusQ is None else self.kMinusQ[k]
+
+        for exciton in excitons:
+            transitionWeights = np.abs(self.eigenvectors[exciton - 1]) ** 2
+            # Same sanity check as yambopy: the eigenvector of each exciton is normalized
+            sumWeights = np.sum(transitionWeights)
+            if abs(sumWeights - 1) > 1e-3:
+                raise ValueError('Excitonic weights does not sum to 1 but to %lf.'%sumWeights)
+
+            np.add.at(weights, (k, c), transitionWeights)
+            np.add.at(weights, (kv, v), transitionWeights)
+
+        return weights
+
+
+
 class Calculations(QObject):
     qPathReady = Signal(list, list)
 
@@ -20,6 +64,7 @@ class Calculations(QObject):
     excitonDispersionRange = Signal(tuple, tuple)
     excitonDispersionNumCurvesChanged = Signal(int)
     excitonDispersionInit = Signal()
+    excitonDispersionPointsAppended = Signal(list, list)
 
     excitonBandStructureReady = Signal(list, list, list)
     excitonBandStructureClear = Signal()
@@ -31,45 +76,229 @@ class Calculations(QObject):
     excitonAbsorptionCurveAppended = Signal(int)
     excitonAbsorptionCurveRemoved = Signal(int)
 
+    excitonAbsorptionMapReady = Signal(object, tuple, tuple)
+    excitonAbsorptionMapClear = Signal()
+
+    excitonWeightMapReady = Signal(object, object)
+    excitonWeightMapClear = Signal()
+
+    # Energies, density of states and fraction of the q-grid evaluated so far
+    excitonDOSReady = Signal(object, object, float)
+    excitonDOSClear = Signal()
+
+    # Energies of one band over a BZ plane, pixel to plane transform and fraction of the refinement done
+    excitonEnergyMapReady = Signal(object, object, float)
+    excitonEnergyMapClear = Signal()
+
+    # Rows of band, type, position, special point, energy and effective mass
+    excitonExtremaReady = Signal(list)
+
+    # Path distances and energies of the excitons matching the search, and a summary of the matches
+    excitonSearchResults = Signal(object, object)
+    excitonSearchSummary = Signal(str)
+
+    # Name and duration in seconds of an operation, from request to result
+    operationFinished = Signal(str, float)
+
     def __init__(self, options):
         super().__init__()
 
         self.options = options
 
+        self.lattice = None
+        self.latticeSaveDir = ''
+        self.dispersionDiagoDir = ''
+
+        # Exciton energies, up to the largest number of excitons requested so far, and cartesian coordinates of every Q-point read
+        self.qEnergies = {}
+        self.qNumExcitons = {}
+        self.carQPoints = {}
+        self.dispersionNumExcitons = 0
+
+        self.threadPool = QThreadPool.globalInstance()
+        self.workers = {}
+
+        # Computations started by clicks, where only the latest selection matters
+        self.scheduler = JobScheduler(self.threadPool, self)
+        self.scheduler.jobDone.connect(self.recordOperation)
+
+        self.operationStarts = {}
+        self.lastOperation = ('', 0.0)
+        self.interpolationJob = 0
+        self.dispersionJob = 0
+        self.dispersionNumCurves = 0
+        self.streaming = False
+        self.pendingQIndices = set()
+
+        self.qIndices = []
+        self.collinear_qpoints = []
+        self.collinearDistances = np.zeros(0)
+
+        # Symmetry-expanded Q-points, indexed once per lattice and set of loaded Q-points
+        self.projector = None
+        self.projectorQIndices = None
+
+        # Cartesian points and distances of the path of the current Brillouin zone
+        self.pathBZ = None
+        self.pathPoints = np.zeros((0, 3))
+        self.pathDistances = np.zeros(0)
+
         self.dispPoints = []
         self.dispPointsData = []
         self.dispXInter = []
         self.dispYInter = []
 
+        # Fit of the current interpolation and its re-evaluation over the visible range of the plot
+        self.dispFit = None
+        self.dispXZoom = None
+        self.dispYZoom = None
+        self.zoomJob = 0
+        self.zoomRange = None
+
+        # Exciton DOS of the fit, evaluated on a uniform q-grid
+        self.dosJob = 0
+        self.dosRequested = False
+        self.dosEdges = np.zeros(0)
+        self.dosEnergies = np.zeros(0)
+        self.dosNumPoints = 0
+
+        # Energies of the fit over a BZ plane, refined from a coarse to a fine grid
+        self.energyMapJob = 0
+        self.energyMapRequested = False
+        self.energyMap = None
+        self.energyMapFraction = 0.0
+        self.energyMapTransform = None
+        self.energyMapBasis = None
+
+        # Stored Q-points unfolded by symmetry and periodic images, for picking from the map
+        self.qPointTree = None
+        self.qPointTreeOwners = None
+        self.qPointTreeIndices = None
+
         self.excAbsData = []
         self.showExcitonLabels = False
 
+        # Absorption spectra of the Q-points neighbouring the last selected one
+        self.absorptionCache = LRUCache('Absorption spectra', 256 * 1024 * 1024)
+        self.prefetchWorkers = {}
+        self.prefetchIndex = -1
+
+        self.prefetchTimer = QTimer()
+        self.prefetchTimer.setSingleShot(True)
+        self.prefetchTimer.setInterval(200)
+        self.prefetchTimer.timeout.connect(self.prefetchAbsorptionSpectra)
+
+        # Absorption of every Q-point along the path
+        self.absorptionMapJob = 0
+        self.absorptionMapSpectra = {}
+        self.absorptionMapWorkers = {}
+        self.absorptionMapWidth = 800
+        self.absorptionMapRequested = False
+
         self.k = []
         self.bands = []
         self.weights = []
-        self.weightFactor = 1.0
 
-    @Slot()
-    def getExcitonDispersion(self):
-        self.lattice = YamboLatticeDB.from_db(self.options.saveDir + '/ns.db1')
-        self.excitonDispersion = ExcitonDispersion(self.lattice, self.options.nExcitons, self.options.diagoDir)
+        # Index of k-Q for every k of the full BZ, built the first time a Q-point is selected and evicted under memory pressure, valid for the current lattice
+        self.kPointTree = None
+        self.kMinusQIndices = LRUCache('k-Q index maps', 64 * 1024 * 1024)
 
-        self.collinear_qpoints, indices, collinear_distances = self.options.qBZ.get_collinear_kpoints(self.excitonDispersion.car_qpoints, self.lattice.sym_car, True)
-        energies = self.excitonDispersion.exc_energies[indices]
+        # Weight of every exciton at every k of the full BZ, per Q-point
+        self.excitonWeightCache = LRUCache('Exciton k-weights', 256 * 1024 * 1024)
 
-        self.qIndices = indices
+        # In-plane points of the symmetry-unfolded BZ and the k-point each one takes its weight from
+        self.weightMapPoints = None
+        self.weightMapOwners = None
 
-        x = collinear_distances
-        y = energies
+        # Squared eigenvector overlaps between Q-points visited one after the other along the path
+        self.overlapCache = LRUCache('Exciton overlaps', 16 * 1024 * 1024)
+
+        # Order of the exciton states of each Q-point that makes every curve follow one exciton character
+        self.qPermutations = {}
+
+        # Energies and intensities of every exciton of every Q-point read, and their columns sorted by energy
+        self.qSearchData = {}
+        self.excitonIndex = buildIndex({})
+        self.searchQuery = ''
 
-        self.dispPoints = [[[x[i], y[i][j]] for i in range(len(x))] for j in range(y.shape[1])]
-        self.dispPointsData = [[PointData(i, j + 1) for i in range(len(x))] for j in range(y.shape[1])]
+        # Caches share one memory budget, what is loaded or pinned is accounted but never evicted
+        self.memoryBudget = MemoryBudget(parent = self)
+        self.memoryBudget.register(self.absorptionCache)
+        self.memoryBudget.register(self.kMinusQIndices)
+        self.memoryBudget.register(self.excitonWeightCache)
+        self.memoryBudget.register(self.overlapCache)
+        self.memoryBudget.registerPinned('Exciton energies', self.storedEnergies)
+        self.memoryBudget.registerPinned('Absorption curves', self.absorptionCurves)
+        self.memoryBudget.registerPinned('Exciton search index', self.excitonSearchIndex)
 
-        if self.options.nQpoints > 1:
-            self.dispXInter, self.dispYInter = self.excitonDispersion.interpolate_dispersion(self.options.qBZ)
+    @Slot()
+    def getExcitonDispersion(self):
+        self.startOperation('dispersion')
+
+        if self.lattice is None or self.latticeSaveDir != self.options.saveDir:
+            self.lattice = YamboLatticeDB.from_db(self.options.saveDir + '/ns.db1')
+            self.latticeSaveDir = self.options.saveDir
+            self.kPointTree = None
+            self.kMinusQIndices.clear()
+            self.projector = CollinearProjector(self.lattice.sym_car, self.lattice.rlat)
+            self.projectorQIndices = None
+            self.pathBZ = None
+            self.weightMapPoints = None
+            self.weightMapOwners = None
+            self.qPointTree = None
+            self.clearQPoints()
+
+        # Energies already read are kept while the directory and precision stay the same
+        if self.dispersionDiagoDir != self.options.diagoDir or any(energies.dtype != self.realType() for energies in self.qEnergies.values()):
+            self.clearQPoints()
+
+        self.dispersionDiagoDir = self.options.diagoDir
+        self.dispersionNumExcitons = self.options.nExcitons
+
+        # Files removed since the last calculation
+        diagoQIndices = set(self.options.diagoQIndices())
+        for iq in [iq for iq in self.qEnergies if iq not in diagoQIndices]:
+            self.removeQPoint(iq)
+
+        # Cancel a previous dispersion still being streamed or interpolated
+        for key in list(self.workers.keys()):
+            self.retireWorker(self.workers.pop(key))
+
+        self.dispersionJob += 1
+        self.interpolationJob += 1
+        self.pendingQIndices.clear()
+        self.cancelSelectionJobs()
+
+        self.cancelAllPrefetches()
+        self.cancelAbsorptionMap()
+        self.absorptionMapRequested = False
+        self.dosRequested = False
+        self.energyMapRequested = False
+        self.absorptionCache.clear()
+        self.excitonWeightCache.clear()
+        self.overlapCache.clear()
+        self.scheduler.cancel('bandTracking')
+        self.qPermutations = {}
+        self.excitonAbsorptionMapClear.emit()
+        self.excitonWeightMapClear.emit()
+        self.excitonDOSClear.emit()
+        self.excitonEnergyMapClear.emit()
+
+        if self.options.streamDispersion:
+            self.streamExcitonDispersion()
+            return
+
+        self.streaming = False
+
+        self.loadQPoints(self.options.diagoQIndices())
+
+        x, y = self.projectDispersion()
+
+        if len(self.qEnergies) > 1 and not self.options.trackBands:
+            loadedQIndices, carQPoints, excEnergies = self.dispersionArrays()
+            self.setInterpolation(*self.interpolateDispersion(loadedQIndices, excEnergies, self.options.qBZ, self.options.samplingBudget))
         else:
-            self.dispXInter = []
-            self.dispYInter = []
+            self.setInterpolation([], [], None)
 
         self.excAbsData = []
 
@@ -78,14 +307,245 @@ class Calculations(QObject):
         xRange = (min(x), max(x))
         yRange = (np.array(y).min(), np.array(y).max())
 
+        self.dispersionNumCurves = len(self.dispYInter)
+
         self.excitonDispersionRange.emit(xRange, yRange)
-        self.excitonDispersionNumCurvesChanged.emit(len(self.dispYInter))
+        self.excitonDispersionNumCurvesChanged.emit(self.dispersionNumCurves)
         self.excitonDispersionInit.emit()
 
         self.excitonBandStructureClear.emit()
         self.excitonAbsorptionClear.emit()
 
-    def interpolateDispersion(self):
+        self.finishOperation('dispersion')
+        self.indexExcitons()
+
+        # Tracked curves are refitted once the overlaps are known
+        if self.options.trackBands:
+            self.refitDispersion()
+
+    def streamExcitonDispersion(self):
+        self.streaming = True
+
+        self.qIndices = []
+        self.collinear_qpoints = []
+        self.dispPoints = [[] for j in range(self.dispersionNumExcitons)]
+        self.dispPointsData = [[] for j in range(self.dispersionNumExcitons)]
+        self.setInterpolation([], [], None)
+
+        self.excAbsData = []
+
+        self.qPathReady.emit(self.options.qBZ.special_kpoints_distances(merge_sections=True), self.options.qBZ.path_labels_list(merge_sections=True))
+
+        self.dispersionNumCurves = self.dispersionNumExcitons
+
+        self.excitonDispersionNumCurvesChanged.emit(self.dispersionNumCurves)
+        self.excitonDispersionInit.emit()
+
+        self.excitonBandStructureClear.emit()
+        self.excitonAbsorptionClear.emit()
+
+        qIndices = self.options.diagoQIndices()
+
+        worker = StreamWorker(self.dispersionJob, self.readQPoints, self.lattice, self.options.diagoDir, self.dispersionNumExcitons, qIndices, self.realType(), self.storedQPoints(qIndices))
+        worker.signals.progress.connect(self.appendStreamedQPoint)
+        worker.signals.finished.connect(self.finishDispersionStream)
+        worker.signals.failed.connect(self.finishDispersionStream)
+
+        self.workers[('dispersion', worker.key)] = worker
+        self.threadPool.start(worker)
+
+    def realType(self):
+        return np.float32 if self.options.singlePrecision else np.float64
+
+    def realArray(self, array, realType = None):
+        # Contiguous arrays of the working precision, drawn by pyqtgraph without copies
+        return np.ascontiguousarray(array, dtype = self.realType() if realType is None else realType)
+
+    def storedEnergies(self):
+        return self.qEnergies
+
+    def absorptionCurves(self):
+        return self.excAbsData
+
+    def excitonSearchIndex(self):
+        return (self.qSearchData, self.excitonIndex)
+
+    def clearQPoints(self):
+        self.qEnergies = {}
+        self.qNumExcitons = {}
+        self.carQPoints = {}
+        self.qSearchData = {}
+
+        # Intensities being read belong to the previous files
+        self.scheduler.cancel('searchIndex')
+
+    def removeQPoint(self, iq):
+        self.qEnergies.pop(iq, None)
+        self.qNumExcitons.pop(iq, None)
+        self.carQPoints.pop(iq, None)
+        self.qSearchData.pop(iq, None)
+
+    def storedQPoints(self, qIndices):
+        return {iq: (self.carQPoints[iq], self.qEnergies[iq], self.qNumExcitons[iq]) for iq in qIndices if iq in self.qEnergies}
+
+    def readExcitonEnergies(self, diagoDir, iq, start, stop):
+        # Only the requested rows of BS_Energies are read from the file
+        with Dataset(os.path.join(diagoDir, "ndb.BS_diago_Q%d"%(iq + 1))) as database:
+            return database.variables['BS_Energies'][start:stop, 0].data * ha2ev
+
+    def readQPoints(self, lattice, diagoDir, nExcitons, qIndices, realType, stored = {}):
+        for iq in qIndices:
+            carQPoint, energies, numExcitons = stored.get(iq, (None, None, 0))
+
+            try:
+                if energies is None:
+                    filename = "ndb.BS_diago_Q%d"%(iq + 1)
+                    excitonDB = YamboExcitonDB.from_db_file(lattice, filename = filename, folder = diagoDir)
+
+                    carQPoint = np.zeros(3) if iq == 0 else np.array(excitonDB.car_qpoint)
+                    energies = self.realArray(excitonDB.eigenvalues[:nExcitons].real, realType)
+                elif numExcitons < nExcitons:
+                    # Lowering the number of excitons is a slice, raising it reads the missing tail
+                    tail = self.readExcitonEnergies(diagoDir, iq, len(energies), nExcitons)
+                    energies = self.realArray(np.concatenate((energies, tail)), realType)
+            except (OSError, RuntimeError, KeyError, IndexError, ValueError):
+                # File not yet completely written by yambo, it will be read when it changes again
+                continue
+
+            yield iq, carQPoint, energies, max(numExcitons, nExcitons)
+
+    def storeQPoint(self, iq, carQPoint, energies, numExcitons):
+        self.qEnergies[iq] = energies
+        self.qNumExcitons[iq] = numExcitons
+        self.carQPoints[iq] = carQPoint
+
+    def loadQPoints(self, qIndices, reuse = True):
+        stored = self.storedQPoints(qIndices) if reuse else {}
+
+        for block in self.readQPoints(self.lattice, self.options.diagoDir, self.dispersionNumExcitons, qIndices, self.realType(), stored):
+            self.storeQPoint(*block)
+
+        self.memoryBudget.enforce()
+
+    @Slot()
+    def appendStreamedQPoint(self, job, block):
+        if job != self.dispersionJob:
+            return
+
+        self.storeQPoint(*block)
+
+        iq, carQPoint = block[0], block[1]
+        energies = block[2][:self.dispersionNumExcitons]
+
+        # A single Q-point is cheaper to project on its own than to re-index all of them
+        projector = CollinearProjector(self.lattice.sym_car, self.lattice.rlat)
+        projector.setPoints([carQPoint])
+        collinearQPoints, indices, distances = projector.project(*self.qPathGeometry())
+
+        points = [[] for j in range(len(energies))]
+        pointsData = [[] for j in range(len(energies))]
+
+        for collinearQPoint, x in zip(collinearQPoints, distances):
+            index = len(self.qIndices)
+
+            self.qIndices.append(iq)
+            self.collinear_qpoints.append(collinearQPoint)
+
+            for j in range(len(energies)):
+                points[j].append([x, energies[j]])
+                pointsData[j].append(PointData(index, j + 1))
+
+        for j in range(len(energies)):
+            self.dispPoints[j].extend(points[j])
+            self.dispPointsData[j].extend(pointsData[j])
+
+        if len(distances) > 0:
+            self.excitonDispersionPointsAppended.emit(points, pointsData)
+
+    @Slot()
+    def finishDispersionStream(self, job, result):
+        self.workers.pop(('dispersion', job), None)
+
+        if job != self.dispersionJob:
+            return
+
+        self.streaming = False
+        self.memoryBudget.enforce()
+        self.finishOperation('dispersion')
+
+        if len(self.qEnergies) == 0:
+            return
+
+        x, y = self.projectDispersion()
+        self.remapAbsorptionIndices()
+
+        xRange = (min(x), max(x))
+        yRange = (np.array(y).min(), np.array(y).max())
+
+        self.excitonDispersionRange.emit(xRange, yRange)
+        self.emitExcitonDispersionReady()
+        self.indexExcitons()
+
+        # Interpolated curves only once every Q-point entering the fit has been read
+        self.refitDispersion()
+
+        if len(self.pendingQIndices) > 0:
+            pendingQIndices = sorted(self.pendingQIndices)
+            self.pendingQIndices.clear()
+            self.updateExcitonDispersion(pendingQIndices)
+
+    def qPathGeometry(self):
+        bz = self.options.qBZ
+
+        if self.pathBZ is not bz:
+            self.pathPoints = red_car(np.asarray(bz.kpoints()), self.lattice.rlat)
+            self.pathDistances = np.asarray(bz.kpoints_distances())
+            self.pathBZ = bz
+
+        return self.pathPoints, self.pathDistances
+
+    def dispersionArrays(self):
+        loadedQIndices = np.array(sorted(self.qEnergies.keys()), dtype = int)
+        carQPoints = np.array([self.carQPoints[iq] for iq in loadedQIndices])
+        excEnergies = np.array([self.qEnergies[iq][:self.dispersionNumExcitons] for iq in loadedQIndices])
+
+        if len(self.qPermutations) > 0:
+            excEnergies = np.take_along_axis(excEnergies, self.statePermutations(loadedQIndices), axis = 1)
+
+        return loadedQIndices, carQPoints, excEnergies
+
+    def statePermutations(self, qIndices):
+        identity = np.arange(self.dispersionNumExcitons)
+        return np.array([self.qPermutations.get(int(iq), identity) for iq in qIndices], dtype = int).reshape(len(qIndices), -1)
+
+    def projectDispersion(self):
+        loadedQIndices, carQPoints, excEnergies = self.dispersionArrays()
+
+        if self.projectorQIndices is None or not np.array_equal(self.projectorQIndices, loadedQIndices):
+            self.projector.setPoints(carQPoints)
+            self.projectorQIndices = loadedQIndices
+
+        self.collinear_qpoints, indices, collinear_distances = self.projector.project(*self.qPathGeometry())
+        energies = excEnergies[indices]
+
+        self.qIndices = loadedQIndices[indices]
+
+        x = collinear_distances
+        y = energies
+
+        self.dispPoints = [self.realArray(np.column_stack((x, y[:, j]))) for j in range(y.shape[1])]
+        # Curves reordered by band tracking still report the exciton index of the file
+        states = self.statePermutations(self.qIndices) + 1
+        self.dispPointsData = [[PointData(i, int(states[i, j])) for i in range(len(x))] for j in range(y.shape[1])]
+
+        self.collinearDistances = np.array(x)
+
+        # Matches sit at the new positions of their Q-points
+        self.emitSearchResults()
+
+        return x, y
+
+    def interpolateDispersion(self, qIndices, excEnergies, bz, samplingBudget = 0):
         lpratio = 10
         fermie = 0
         nelect = 0
@@ -95,7 +555,9 @@ class Calculations(QObject):
         for idx_bz, idx_ibz in enumerate(self.lattice.kpoints_indexes):
             ibz_kpoints[idx_ibz] = self.lattice.red_kpoints[idx_bz]
 
-        ibz_energies = self.excitonDispersion.exc_energies
+        # Only the Q-points read so far enter the fit
+        ibz_kpoints = ibz_kpoints[qIndices]
+        ibz_energies = excEnergies
 
         na = np.newaxis
 
@@ -104,57 +566,768 @@ class Calculations(QObject):
         symrel = [sym for sym, trev in zip(self.lattice.sym_rec_red, self.lattice.time_rev_list) if trev == False ]
         time_rev = False
 
-        skw = SkwInterpolator(lpratio, ibz_kpoints, ibz_energies[na, :, :], fermie, nelect, cell, symrel, time_rev, verbose=False)
+        # The fit itself is always done in double precision
+        skw = SkwInterpolator(lpratio, ibz_kpoints, np.asarray(ibz_energies, dtype = np.float64)[na, :, :], fermie, nelect, cell, symrel, time_rev, verbose=False)
+
+        # The path of qBZ is the coarse start of the adaptive sampling
+        if samplingBudget > len(bz.kpoints()):
+            x, energies = refinePath(partial(self.evaluateFit, skw), bz.kpoints(), bz.kpoints_distances(), samplingBudget)
+        else:
+            x, energies = bz.kpoints_distances(), self.evaluateFit(skw, bz.kpoints())
+
+        return self.realArray(x), self.realArray(np.transpose(energies)), skw
+
+    def evaluateFit(self, skw, kpoints):
+        return skw.interp_kpts(np.asarray(kpoints)).eigens[0]
+
+    def setInterpolation(self, xInter, yInter, fit):
+        self.dispXInter = xInter
+        self.dispYInter = yInter
+        self.dispFit = fit
+
+        # The visible range is re-evaluated with the new fit
+        self.zoomJob += 1
+        self.dispXZoom = None
+        self.dispYZoom = None
+
+        if fit is not None and self.zoomRange is not None:
+            self.interpolateVisibleRange(*self.zoomRange)
+
+        self.emitExcitonExtrema()
+
+        if self.dosRequested:
+            self.computeExcitonDOS()
+
+        if self.energyMapRequested:
+            self.computeExcitonEnergyMap()
+
+    def emitExcitonExtrema(self):
+        if self.dispFit is None or len(self.dispXInter) < 3:
+            self.excitonExtremaReady.emit([])
+            return
+
+        self.startOperation('extrema')
+
+        bz = self.options.qBZ
+        pathPoints, pathDistances = self.qPathGeometry()
+
+        extrema = pathExtrema(self.dispXInter, self.dispYInter, skwArrays(self.dispFit), np.asarray(bz.kpoints()), pathDistances)
+
+        # Cartesian length, in units of the reciprocal lattice, of a unit of path distance
+        steps = np.diff(pathDistances)
+        pathScale = np.median(np.linalg.norm(np.diff(pathPoints, axis = 0), axis = 1)[steps > 0] / steps[steps > 0])
+
+        specialDistances = np.asarray(bz.special_kpoints_distances(merge_sections=True))
+        specialLabels = bz.path_labels_list(merge_sections=True)
+        tolerance = 1.0e-3 * (pathDistances[-1] - pathDistances[0])
+
+        rows = []
+        for band, isMinimum, position, energy, curvature in extrema:
+            nearest = np.argmin(np.abs(specialDistances - position)) if len(specialDistances) > 0 else -1
+            label = specialLabels[nearest] if nearest >= 0 and abs(specialDistances[nearest] - position) < tolerance else ''
+
+            rows.append((band + 1, 'Minimum' if isMinimum else 'Maximum', position, label, energy, effectiveMass(curvature, pathScale, ha2ev)))
+
+        self.excitonExtremaReady.emit(rows)
+        self.finishOperation('extrema')
+
+    @Slot()
+    def interpolateVisibleRange(self, xMin, xMax, width):
+        self.zoomRange = (xMin, xMax, width)
+        self.zoomJob += 1
+
+        if self.dispFit is None or len(self.dispXInter) < 2:
+            return
+
+        x0, x1 = self.dispXInter[0], self.dispXInter[-1]
+
+        # The whole path in view is drawn from the global samples
+        if (xMin <= x0 and xMax >= x1) or xMax <= x0 or xMin >= x1:
+            if self.dispXZoom is not None:
+                self.dispXZoom = None
+                self.dispYZoom = None
+                self.emitExcitonDispersionReady()
+            return
+
+        # As many points as screen pixels, whatever the zoom level
+        self.startOperation('zoom')
+
+        worker = Worker(self.zoomJob, self.interpolateRange, self.dispFit, self.options.qBZ, max(xMin, x0), min(xMax, x1), max(width, 2))
+        worker.signals.finished.connect(self.setVisibleRangeInterpolation)
+        worker.signals.failed.connect(self.discardVisibleRangeInterpolation)
+
+        self.workers[('zoom', worker.key)] = worker
+        self.threadPool.start(worker)
+
+    def interpolateRange(self, skw, bz, xMin, xMax, numPoints):
+        x = np.linspace(xMin, xMax, numPoints)
+        energies = self.evaluateFit(skw, pathKPoints(np.asarray(bz.kpoints()), np.asarray(bz.kpoints_distances()), x))
+
+        return x, np.transpose(energies)
+
+    @Slot()
+    def setVisibleRangeInterpolation(self, job, result):
+        self.workers.pop(('zoom', job), None)
+
+        if job != self.zoomJob:
+            return
+
+        x, y = result
+
+        # Global samples are kept outside the visible range for panning
+        xInter = np.asarray(self.dispXInter)
+        yInter = np.asarray(self.dispYInter)
+        left = xInter < x[0]
+        right = xInter > x[-1]
+
+        self.dispXZoom = self.realArray(np.concatenate((xInter[left], x, xInter[right])))
+        self.dispYZoom = self.realArray(np.concatenate((yInter[:, left], y, yInter[:, right]), axis = 1))
+
+        self.emitExcitonDispersionReady()
+        self.finishOperation('zoom')
+
+    @Slot()
+    def discardVisibleRangeInterpolation(self, job, message):
+        self.workers.pop(('zoom', job), None)
+
+    @Slot()
+    def updateExcitonDispersion(self, qIndices):
+        # Nothing to merge into until a dispersion has been computed from this directory
+        if self.lattice is None or self.dispersionDiagoDir != self.options.diagoDir:
+            return
+
+        # The running stream reads its own file list, merge these afterwards
+        if self.streaming:
+            self.pendingQIndices.update(qIndices)
+            return
+
+        self.loadQPoints(qIndices, reuse = False)
+        self.projectorQIndices = None
+
+        # Modified files invalidate their cached spectra
+        for q in qIndices:
+            if q in self.prefetchWorkers:
+                self.cancelPrefetch(q)
+        self.absorptionCache.removeIf(lambda key: key[0] in qIndices)
+        self.excitonWeightCache.removeIf(lambda key: key in qIndices)
+        self.overlapCache.removeIf(lambda key: key[0] in qIndices or key[1] in qIndices)
+        for q in qIndices:
+            self.qSearchData.pop(q, None)
+
+        if len(self.qEnergies) == 0:
+            return
+
+        self.cancelSelectionJobs()
+        self.projectDispersion()
+        self.remapAbsorptionIndices()
+        self.emitExcitonDispersionReady()
+        self.indexExcitons()
+
+        self.refitDispersion()
+
+    @Slot()
+    def updateQPath(self):
+        # Loaded energies do not depend on the path, only their projection and the interpolation do
+        if self.lattice is None or len(self.qEnergies) == 0:
+            return
+
+        self.getQPathCartesian()
+
+        # The running stream projects everything onto the current path when it finishes
+        if self.streaming:
+            return
+
+        self.cancelAllPrefetches()
+        self.prefetchIndex = -1
+        self.cancelSelectionJobs()
+
+        x, y = self.projectDispersion()
+        self.remapAbsorptionIndices()
+
+        # Curves interpolated along the old path are dropped until the refit arrives
+        self.setInterpolation([], [], None)
+
+        if len(x) > 0:
+            self.excitonDispersionRange.emit((min(x), max(x)), (np.array(y).min(), np.array(y).max()))
+        self.emitExcitonDispersionReady()
+
+        self.excitonBandStructureClear.emit()
+
+        if self.absorptionMapRequested:
+            self.computeAbsorptionMap()
+
+        self.refitDispersion()
+
+    def refitDispersion(self):
+        if len(self.qEnergies) < 2:
+            return
+
+        if self.options.trackBands:
+            self.trackBands()
+        else:
+            self.fitDispersion()
+
+    def fitDispersion(self):
+        loadedQIndices, carQPoints, excEnergies = self.dispersionArrays()
+
+        self.interpolationJob += 1
+        self.startOperation('interpolation')
+
+        worker = Worker(self.interpolationJob, self.interpolateDispersion, loadedQIndices, excEnergies, self.options.qBZ, self.options.samplingBudget)
+        worker.signals.finished.connect(self.setDispersionInterpolation)
+        worker.signals.failed.connect(self.discardInterpolation)
+
+        self.workers[('interpolation', worker.key)] = worker
+        self.threadPool.start(worker)
+
+    def trackBands(self):
+        numStates = self.dispersionNumExcitons
+        loadedQIndices = np.array(sorted(self.qEnergies.keys()), dtype = int)
+
+        # Every Q-point entering the fit is tracked, so that no band mixes tracked and energy-sorted states; curves start sorted by energy where the path starts
+        sequence = pathSequence(self.qIndices)
+        root = int(sequence[0]) if len(sequence) > 0 else int(loadedQIndices[0])
+        pairs = meshPairs(root, loadedQIndices, [self.carQPoints[iq] for iq in loadedQIndices], self.lattice.rlat)
+
+        # Overlaps already known are gathered here, the worker only reads the eigenvectors of the rest
+        overlaps = {(a, b): self.overlapCache.get((a, b, numStates)) for a, b in pairs}
+
+        self.scheduler.submit('bandTracking', self.excitonOverlaps, (self.dispersionDiagoDir, overlaps, numStates, self.realType()), partial(self.setBandTracking, root, pairs, numStates), self.discardBandTracking)
+
+    def readExcitonEigenvectors(self, diagoDir, iq, numStates, realType):
+        # Only the first eigenvectors (all of them without numStates) and the transition table are read from the file
+        with Dataset(os.path.join(diagoDir, "ndb.BS_diago_Q%d"%(iq + 1))) as database:
+            if 'BS_EIGENSTATES' not in database.variables:
+                raise ValueError('No exciton eigenvectors in ndb.BS_diago_Q%d'%(iq + 1))
+
+            eigenvectors = database.variables['BS_EIGENSTATES'][:numStates, ...].data
+            table = np.rint(database.variables['BS_TABLE'][:].T).astype(int)
+
+        return table, complexArray(eigenvectors, realType)
+
+    def excitonOverlaps(self, diagoDir, overlaps, numStates, realType):
+        overlaps = dict(overlaps)
+        read = {}
+
+        missing = [pair for pair, matrix in overlaps.items() if matrix is None]
+
+        # Eigenvectors are kept only while a pair still to be computed needs them
+        uses = Counter(iq for pair in missing for iq in pair)
+
+        for a, b in missing:
+            for iq in (a, b):
+                if iq not in read:
+                    read[iq] = self.readExcitonEigenvectors(diagoDir, iq, numStates, realType)
+
+            overlaps[(a, b)] = overlapMatrix(*read[a], *read[b])
+
+            for iq in (a, b):
+                uses[iq] -= 1
+                if uses[iq] == 0:
+                    read.pop(iq)
+
+        return overlaps
 
-        energies = skw.interp_kpts(self.options.qBZ.kpoints()).eigens
+    def setBandTracking(self, root, pairs, numStates, overlaps):
+        if numStates != self.dispersionNumExcitons:
+            return
 
-        return self.options.qBZ.kpoints_distances(), np.transpose(energies[0])
+        # The computing time of the job is shared by the overlaps it computed
+        computed = [(a, b) for a, b in overlaps if (a, b, numStates) not in self.overlapCache]
+        for a, b in computed:
+            self.overlapCache.put((a, b, numStates), overlaps[(a, b)], cost = self.scheduler.seconds.get('bandTracking', 0.0) / len(computed))
+
+        self.qPermutations = trackPermutations(root, pairs, overlaps, numStates)
+
+        self.projectDispersion()
+        self.emitExcitonDispersionReady()
+
+        self.fitDispersion()
+
+    def discardBandTracking(self, message):
+        # Curves stay sorted by energy
+        self.qPermutations = {}
+        self.projectDispersion()
+        self.emitExcitonDispersionReady()
+
+        self.fitDispersion()
+
+    @Slot()
+    def updateBandTracking(self):
+        if self.lattice is None or self.streaming or len(self.qEnergies) < 2:
+            return
+
+        if self.options.trackBands:
+            self.refitDispersion()
+        else:
+            self.scheduler.cancel('bandTracking')
+            self.discardBandTracking('')
+
+    @Slot()
+    def setDispersionInterpolation(self, job, result):
+        self.workers.pop(('interpolation', job), None)
+
+        # A newer refit has been queued meanwhile
+        if job != self.interpolationJob:
+            return
+
+        self.setInterpolation(*result)
+        self.finishOperation('interpolation')
+
+        if len(self.dispYInter) != self.dispersionNumCurves:
+            self.dispersionNumCurves = len(self.dispYInter)
+            self.excitonDispersionNumCurvesChanged.emit(self.dispersionNumCurves)
+            self.excitonDispersionInit.emit()
+        else:
+            self.emitExcitonDispersionReady()
+
+    @Slot()
+    def discardInterpolation(self, job, message):
+        self.workers.pop(('interpolation', job), None)
+
+    @Slot()
+    def computeExcitonDOS(self):
+        self.dosRequested = True
+        self.dosJob += 1
+
+        worker = self.workers.pop('dos', None)
+        if worker is not None:
+            self.retireWorker(worker)
+
+        if self.dispFit is None or len(self.dispYInter) == 0:
+            self.excitonDOSClear.emit()
+            return
+
+        self.startOperation('dos')
+
+        # States of the fit beyond the path are cut off by the energy window, widened to catch most of them
+        energyMin, energyMax = np.min(self.dispYInter), np.max(self.dispYInter)
+        margin = 0.25 * (energyMax - energyMin) + self.options.broadeningCutoff * self.options.broadening
+        step = self.options.energyStep
+
+        self.dosEnergies = np.arange(energyMin - margin, energyMax + margin + step, step)
+        self.dosEdges = np.arange(energyMin - margin, energyMax + margin + step, step / 4)
+
+        shape = gridShape(self.lattice.red_kpoints, self.options.dosGridSize)
+        self.dosNumPoints = int(np.prod(shape))
+
+        worker = StreamWorker(('dos', self.dosJob), streamHistogram, skwArrays(self.dispFit), shape, self.dosEdges)
+        worker.signals.progress.connect(self.updateExcitonDOS)
+        worker.signals.finished.connect(self.finishExcitonDOS)
+        worker.signals.failed.connect(self.finishExcitonDOS)
+
+        self.workers['dos'] = worker
+        self.threadPool.start(worker)
+
+    @Slot()
+    def updateExcitonDOS(self, key, item):
+        if key[1] != self.dosJob:
+            return
+
+        fraction, counts = item
+
+        # Normalized to the q-points evaluated so far, so partial results already have the final scale
+        profile = 'Lorentzian' if self.options.broadeningProfile == 'yambopy' else self.options.broadeningProfile
+        centers = (self.dosEdges[:-1] + self.dosEdges[1:]) / 2
+        dos = broadenSpectrum(centers, counts / (fraction * self.dosNumPoints), self.dosEnergies, self.options.broadening, profile, self.options.broadeningCutoff)
+
+        self.excitonDOSReady.emit(self.realArray(self.dosEnergies), self.realArray(dos), fraction)
+
+    @Slot()
+    def finishExcitonDOS(self, key, result):
+        if key[1] != self.dosJob:
+            return
+
+        self.workers.pop('dos', None)
+        self.finishOperation('dos')
+
+    @Slot()
+    def computeExcitonEnergyMap(self):
+        self.energyMapRequested = True
+        self.energyMapJob += 1
+
+        worker = self.workers.pop('energyMap', None)
+        if worker is not None:
+            self.retireWorker(worker)
+
+        if self.dispFit is None:
+            self.energyMap = None
+            self.excitonEnergyMapClear.emit()
+            return
+
+        self.startOperation('energyMap')
+
+        axes = MAP_PLANES[self.options.energyMapPlane]
+        self.energyMapBasis = planeBasis(self.lattice.rlat, axes)
+
+        worker = StreamWorker(('energyMap', self.energyMapJob), streamEnergyMap, skwArrays(self.dispFit), axes, self.options.energyMapSize)
+        worker.signals.progress.connect(self.updateExcitonEnergyMap)
+        worker.signals.finished.connect(self.finishExcitonEnergyMap)
+        worker.signals.failed.connect(self.finishExcitonEnergyMap)
+
+        self.workers['energyMap'] = worker
+        self.threadPool.start(worker)
+
+    @Slot()
+    def recomputeExcitonEnergyMap(self):
+        if self.energyMapRequested:
+            self.computeExcitonEnergyMap()
+
+    @Slot()
+    def updateExcitonEnergyMap(self, key, item):
+        if key[1] != self.energyMapJob:
+            return
+
+        self.energyMapFraction, self.energyMap = item
+        self.energyMapTransform = pixelTransform(self.lattice.rlat, MAP_PLANES[self.options.energyMapPlane], len(self.energyMap))
+
+        self.emitExcitonEnergyMap()
+
+    @Slot()
+    def finishExcitonEnergyMap(self, key, result):
+        if key[1] != self.energyMapJob:
+            return
+
+        self.workers.pop('energyMap', None)
+        self.finishOperation('energyMap')
+
+    @Slot()
+    def emitExcitonEnergyMap(self):
+        if self.energyMap is None:
+            return
+
+        band = min(self.options.energyMapBand, self.energyMap.shape[2]) - 1
+        self.excitonEnergyMapReady.emit(self.realArray(self.energyMap[:, :, band]), self.energyMapTransform, self.energyMapFraction)
+
+    @Slot()
+    def selectMapQPoint(self, x, y):
+        if self.energyMapBasis is None or len(self.qIndices) == 0:
+            return
+
+        # Absorption curves are tied to points of the dispersion, so the Q-points on the path are the ones picked
+        pathQIndices = np.unique(self.qIndices)
+
+        if self.qPointTree is None or not np.array_equal(self.qPointTreeIndices, pathQIndices):
+            rlat = np.asarray(self.lattice.rlat)
+            shifts = np.array([i * rlat[0] + j * rlat[1] + k * rlat[2] for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)])
+
+            points, owners = expandBySymmetry(np.array([self.carQPoints[iq] for iq in pathQIndices]), self.lattice.sym_car)
+
+            self.qPointTree = cKDTree((points[np.newaxis, :, :] + shifts[:, np.newaxis, :]).reshape(-1, 3))
+            self.qPointTreeOwners = pathQIndices[np.tile(owners, len(shifts))]
+            self.qPointTreeIndices = pathQIndices
+
+        distance, nearest = self.qPointTree.query(np.array([x, y]) @ self.energyMapBasis)
+
+        # While streaming qIndices is a list, and the owner may have left the path since the tree was built
+        indices = np.flatnonzero(np.asarray(self.qIndices) == self.qPointTreeOwners[nearest])
+        if len(indices) == 0:
+            return
+
+        self.selectQPointIndex(int(indices[0]), False)
+
+    def indexExcitons(self):
+        # Only Q-points not indexed yet are read
+        qIndices = [iq for iq in self.qEnergies if iq not in self.qSearchData]
+
+        if len(qIndices) == 0:
+            self.setExcitonSearchData({})
+            return
+
+        self.scheduler.submit('searchIndex', self.readSearchData, (self.dispersionDiagoDir, qIndices), self.setExcitonSearchData, priority = -1)
+
+    def readSearchData(self, diagoDir, qIndices):
+        searchData = {}
+
+        for iq in qIndices:
+            try:
+                searchData[iq] = self.readExcitonIntensities(diagoDir, iq)
+            except (OSError, RuntimeError, KeyError, IndexError, ValueError):
+                # File not yet completely written by yambo, it is indexed when it changes again
+                continue
+
+        return searchData
+
+    def readExcitonIntensities(self, diagoDir, iq):
+        # Energies and residuals are a few numbers per exciton, eigenvectors are not read
+        with Dataset(os.path.join(diagoDir, "ndb.BS_diago_Q%d"%(iq + 1))) as database:
+            energies = database.variables['BS_Energies'][:, 0].data * ha2ev
+
+            if 'BS_left_Residuals' in database.variables:
+                left = database.variables['BS_left_Residuals'][...].data
+                right = database.variables['BS_right_Residuals'][...].data
+                left = left[..., 0] + 1j * left[..., 1]
+                right = right[..., 0] + 1j * right[..., 1]
+            else:
+                residuals = database.variables['BS_Residuals'][...].data
+                left = residuals[:, 0] + 1j * residuals[:, 1]
+                right = residuals[:, 2] + 1j * residuals[:, 3]
+
+        # Normalized in the index, over all Q-points for comparisons and orderings, per Q-point for bright and dark
+        return energies, np.abs(left * right)
+
+    def setExcitonSearchData(self, searchData):
+        self.qSearchData.update(searchData)
+        self.excitonIndex = buildIndex({iq: data for iq, data in self.qSearchData.items() if iq in self.qEnergies})
+
+        self.emitSearchResults()
+
+    @Slot()
+    def searchExcitons(self, text):
+        self.searchQuery = text
+        self.emitSearchResults()
+
+    @Slot()
+    def emitSearchResults(self):
+        if self.searchQuery.strip() == '':
+            self.excitonSearchResults.emit(np.zeros(0), np.zeros(0))
+            self.excitonSearchSummary.emit('')
+            return
+
+        try:
+            query = parseQuery(self.searchQuery)
+        except ValueError as error:
+            self.excitonSearchResults.emit(np.zeros(0), np.zeros(0))
+            self.excitonSearchSummary.emit(f'Unknown term: {error}')
+            return
+
+        matches = searchIndex(self.excitonIndex, query, self.options.excMinIntensity)
+
+        # Every match is drawn wherever its Q-point lies on the path; streamed Q-points have no position until the stream finishes and searches again
+        pending = self.streaming or len(self.qIndices) != len(self.collinearDistances)
+        pathQIndices = np.asarray([] if pending else self.qIndices, dtype = int)
+        order = np.argsort(pathQIndices, kind = 'stable')
+        sortedQIndices = pathQIndices[order]
+
+        matchQIndices = self.excitonIndex['q'][matches]
+        starts = np.searchsorted(sortedQIndices, matchQIndices, side = 'left')
+        counts = np.searchsorted(sortedQIndices, matchQIndices, side = 'right') - starts
+
+        owners = np.repeat(np.arange(len(matches)), counts)
+        positions = order[np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+
+        x = self.realArray(np.asarray(self.collinearDistances)[positions])
+        y = self.realArray(self.excitonIndex['energy'][matches][owners])
+
+        summary = f'{len(matches)} matches, ' + ('shown once the dispersion is loaded' if pending else f'{np.count_nonzero(counts)} on the path')
+        if 0 < len(matches) <= 5:
+            summary += ': ' + ', '.join(f"Q{q + 1} #{j} {e:.3f} eV" for q, j, e in zip(matchQIndices, self.excitonIndex['exciton'][matches], self.excitonIndex['energy'][matches]))
+
+        self.excitonSearchResults.emit(x, y)
+        self.excitonSearchSummary.emit(summary)
+
+    def startOperation(self, name):
+        self.operationStarts[name] = perf_counter()
+
+    def finishOperation(self, name):
+        start = self.operationStarts.pop(name, None)
+        if start is not None:
+            self.recordOperation(name, perf_counter() - start)
+
+    @Slot()
+    def recordOperation(self, name, seconds):
+        self.lastOperation = (name, seconds)
+        self.operationFinished.emit(name, seconds)
+
+    def retireWorker(self, worker):
+        self.scheduler.retire(worker)
+
+    def cancelSelectionJobs(self):
+        # Selections refer to indices of the projected dispersion
+        self.scheduler.cancel('absorption')
+        self.scheduler.cancel('bandStructure')
+        self.scheduler.cancel('weightMap')
+
+    def remapAbsorptionIndices(self):
+        removed = False
+
+        # Curves of Q-points no longer on the path have no position to be recomputed or selected from
+        for curveIndex in reversed(range(len(self.excAbsData))):
+            curveData = self.excAbsData[curveIndex]
+            newIndex = np.flatnonzero(np.asarray(self.qIndices) == curveData['q'])
+
+            if len(newIndex) > 0:
+                curveData['index'] = int(newIndex[0])
+                for pointData in curveData['data']:
+                    pointData.i = curveData['index']
+            else:
+                self.excAbsData.pop(curveIndex)
+                self.excitonAbsorptionCurveRemoved.emit(curveIndex)
+                removed = True
+
+        if removed:
+            self.excitonAbsorptionReady.emit(self.excAbsData, self.showExcitonLabels)
 
     @Slot()
     def emitExcitonDispersionReady(self):
-        self.excitonDispersionReady.emit(self.dispPoints, self.dispPointsData, self.dispXInter, self.dispYInter)
+        if self.dispXZoom is not None:
+            self.excitonDispersionReady.emit(self.dispPoints, self.dispPointsData, self.dispXZoom, self.dispYZoom)
+        else:
+            self.excitonDispersionReady.emit(self.dispPoints, self.dispPointsData, self.dispXInter, self.dispYInter)
 
-    def computeAbsorptionSpectrum(self, index):
-        # qPointIndex = self.dispersionData['qindices'][index]
-        qPointIndex = self.qIndices[index]
+    def absorptionParameters(self):
+        # Everything a spectrum depends on, given to the workers rather than read by them, and part of the cache keys
+        return (self.lattice, self.dispersionDiagoDir, self.options.energyStep, self.options.energyMin, self.options.energyMax, self.options.excMinIntensity, self.options.broadeningProfile, self.options.broadening, self.options.broadeningCutoff, self.options.singlePrecision)
+
+    def absorptionSpectrum(self, qPointIndex, lattice, diagoDir, energyStep, energyMin, energyMax, excMinIntensity, broadeningProfile, broadening, broadeningCutoff, singlePrecision):
+        start = perf_counter()
+        realType = np.float32 if singlePrecision else np.float64
 
         filename = "ndb.BS_diago_Q%d"%(qPointIndex + 1)
 
-        excitonDB = YamboExcitonDB.from_db_file(self.lattice, filename = filename, folder = self.options.diagoDir)
+        excitonDB = YamboExcitonDB.from_db_file(lattice, filename = filename, folder = diagoDir)
 
-        energyRange, epsilon = excitonDB.get_chi(estep = self.options.energyStep, emin = self.options.energyMin, emax = self.options.energyMax)
+        if broadeningProfile == 'yambopy':
+            energyRange, epsilon = excitonDB.get_chi(estep = energyStep, emin = energyMin, emax = energyMax, broad = broadening)
+        else:
+            energyRange = np.arange(energyMin, energyMax, energyStep)
+            energyRange = energyRange.astype(realType)
+            energies = excitonDB.eigenvalues.real.astype(realType)
+            strengths = (excitonDB.l_residual * excitonDB.r_residual).astype(np.result_type(realType, np.complex64))
+
+            # Resonant and antiresonant terms, as in get_chi, with the chosen lineshape; only the absorption, Im(epsilon), is computed
+            chi = broadenSpectrum(np.concatenate((energies, -energies)), np.concatenate((strengths, -strengths)), energyRange, broadening, profile = broadeningProfile, cutoff = broadeningCutoff, response = True)
+            epsilon = 1.0 + 1j * chi * self.responseCofactor(excitonDB)
 
         # excitonAbsorption = YamboBSEAbsorptionSpectra(excitonDB, qpt = qPointIndex + 1, path = self.options.parentDir, job_string = self.options.jobString, save = self.options.saveDir)
         excitonAbsorption = YamboBSEAbsorptionSpectra(excitonDB)
 
-        allExcitons = excitonAbsorption.get_excitons(min_intensity = 0.0, max_energy = self.options.energyMax)
+        allExcitons = excitonAbsorption.get_excitons(min_intensity = 0.0, max_energy = energyMax)
         allExcitons = np.array(allExcitons).real
 
-        brightExcitons = []
-        darkExcitons = []
-        brightExcAbsInterp = []
-        pointsData = []
+        brightExcitons = np.zeros((0, 3))
+        darkExcitons = np.zeros((0, 3))
+        brightExcAbsInterp = np.zeros(0)
 
         if len(allExcitons) > 0:
-            brightExcitons = allExcitons[(allExcitons[:, 1] >= self.options.excMinIntensity)]
-            darkExcitons = allExcitons[(allExcitons[:, 1] < self.options.excMinIntensity)]
+            brightExcitons = allExcitons[(allExcitons[:, 1] >= excMinIntensity)]
+            darkExcitons = allExcitons[(allExcitons[:, 1] < excMinIntensity)]
 
             brightExcAbsInterp = np.interp(brightExcitons[:, 0], energyRange, epsilon.imag)
 
-            pointsData = [PointData(index, int(j)) for j in brightExcitons[:, 2]]
+        return {'q': qPointIndex, 'energy': self.realArray(energyRange, realType), 'absorption': self.realArray(epsilon.imag, realType), 'brightExcEnergy': self.realArray(brightExcitons[:, 0], realType), 'brightExcAbsorption': self.realArray(brightExcAbsInterp, realType), 'brightExcIntensities': brightExcitons[:, 1], 'brightExcIndices': brightExcitons[:, 2], 'darkExcEnergy': self.realArray(darkExcitons[:, 0], realType), 'seconds': perf_counter() - start}
+
+    def responseCofactor(self, excitonDB, spinDegen = 2, q0norm = 1e-5):
+        # Dimensional factors of YamboExcitonDB.get_chi, so that every lineshape is on the scale of the yambopy one
+        if not excitonDB.Qpt == '1':
+            q0norm = 2 * np.pi * np.linalg.norm(excitonDB.car_qpoint)
+        if excitonDB.q_cutoff is not None:
+            q0norm = excitonDB.q_cutoff
+
+        d3kFactor = excitonDB.lattice.rlat_vol / excitonDB.lattice.nkpoints
+
+        return ha2ev * spinDegen / (2 * np.pi) ** 3 * d3kFactor * (4 * np.pi) / q0norm ** 2
+
+    def computeAbsorptionSpectrum(self, index, spectrum = None):
+        # qPointIndex = self.dispersionData['qindices'][index]
+        qPointIndex = int(self.qIndices[index])
+
+        key = (qPointIndex,) + self.absorptionParameters()
+
+        if spectrum is None:
+            spectrum = self.absorptionCache.get(key)
+        if spectrum is None:
+            spectrum = self.absorptionSpectrum(qPointIndex, *self.absorptionParameters())
+            self.absorptionCache.put(key, spectrum, cost = spectrum['seconds'])
 
-        return {'q': qPointIndex, 'index': index, 'energy': energyRange, 'absorption': epsilon.imag, 'brightExcEnergy': brightExcitons[:, 0], 'brightExcAbsorption': brightExcAbsInterp, 'brightExcIntensities': brightExcitons[:, 1], 'brightExcIndices': brightExcitons[:, 2], 'darkExcEnergy': darkExcitons[:, 0], 'data': pointsData}
+        data = dict(spectrum)
+        data['index'] = index
+        data['data'] = [PointData(index, int(j)) for j in spectrum['brightExcIndices']]
+
+        return data
+
+    @Slot()
+    def prefetchAbsorptionSpectra(self):
+        index = self.prefetchIndex
+
+        if index < 0 or index >= len(self.qIndices):
+            return
+
+        qPointIndex = int(self.qIndices[index])
+        neighbours = {int(self.qIndices[i]) for i in (index - 1, index + 1) if 0 <= i < len(self.qIndices)}
+        neighbours.discard(qPointIndex)
+
+        # The user jumped elsewhere: drop what is no longer adjacent
+        for q in list(self.prefetchWorkers.keys()):
+            if q not in neighbours:
+                self.cancelPrefetch(q)
+
+        parameters = self.absorptionParameters()
+
+        for q in neighbours:
+            key = (q,) + parameters
+            if key in self.absorptionCache or q in self.prefetchWorkers:
+                continue
+
+            worker = Worker(key, self.absorptionSpectrum, q, *parameters)
+            worker.signals.finished.connect(self.storePrefetchedSpectrum)
+            worker.signals.failed.connect(self.discardPrefetchedSpectrum)
+
+            self.prefetchWorkers[q] = worker
+            self.threadPool.start(worker, -1)
+
+    def cancelPrefetch(self, q):
+        self.retireWorker(self.prefetchWorkers.pop(q))
+
+    def cancelAllPrefetches(self):
+        self.prefetchTimer.stop()
+        for q in list(self.prefetchWorkers.keys()):
+            self.cancelPrefetch(q)
+
+    @Slot()
+    def storePrefetchedSpectrum(self, key, spectrum):
+        worker = self.prefetchWorkers.get(key[0])
+        if worker is not None and worker.key == key:
+            self.prefetchWorkers.pop(key[0])
+
+        # Parameters changed while the spectrum was being computed
+        if key[1:] == self.absorptionParameters():
+            self.absorptionCache.put(key, spectrum, cost = spectrum['seconds'])
+
+    @Slot()
+    def discardPrefetchedSpectrum(self, key, message):
+        worker = self.prefetchWorkers.get(key[0])
+        if worker is not None and worker.key == key:
+            self.prefetchWorkers.pop(key[0])
 
     @Slot()
     def computeQPointAbsorptionSpectrum(self, points, toggleCurve):
-        index = points[0].data().i
+        self.selectQPointIndex(points[0].data().i, toggleCurve)
+
+    def selectQPointIndex(self, index, toggleCurve):
         # qPointIndex = self.dispersionData['qindices'][index]
-        qPointIndex = self.qIndices[index]
+        qPointIndex = int(self.qIndices[index])
+
+        # A spectrum still being computed for a previous click is no longer wanted
+        self.scheduler.cancel('absorption')
+
+        self.prefetchIndex = index
+        self.prefetchTimer.start()
+
+        if self.absorptionCurveIndex(qPointIndex) < 0:
+            key = (qPointIndex,) + self.absorptionParameters()
+            if key not in self.absorptionCache:
+                self.scheduler.submit('absorption', self.absorptionSpectrum, key, partial(self.storeSelectedSpectrum, index, toggleCurve, key))
+                return
+
+        self.selectQPointAbsorption(index, toggleCurve)
+
+    def storeSelectedSpectrum(self, index, toggleCurve, key, spectrum):
+        self.absorptionCache.put(key, spectrum, cost = spectrum['seconds'])
+
+        # Parameters changed while the spectrum was being computed
+        if key[1:] != self.absorptionParameters():
+            spectrum = None
+
+        self.selectQPointAbsorption(index, toggleCurve, spectrum)
+
+    def selectQPointAbsorption(self, index, toggleCurve, spectrum = None):
+        qPointIndex = int(self.qIndices[index])
 
         curveIndex = self.absorptionCurveIndex(qPointIndex)
 
         if curveIndex < 0:
-            data = self.computeAbsorptionSpectrum(index)
+            data = self.computeAbsorptionSpectrum(index, spectrum)
             data['fixed'] = toggleCurve
             self.excAbsData.append(data)
             self.excitonAbsorptionCurveAppended.emit(data['q'])
@@ -172,6 +1345,101 @@ class Calculations(QObject):
 
         self.excitonAbsorptionReady.emit(self.excAbsData, self.showExcitonLabels)
 
+        self.memoryBudget.enforce()
+
+    @Slot()
+    def computeAbsorptionMap(self):
+        if self.streaming or len(self.qIndices) == 0:
+            return
+
+        self.cancelAbsorptionMap()
+        self.absorptionMapJob += 1
+        self.absorptionMapRequested = True
+        self.startOperation('absorptionMap')
+
+        parameters = self.absorptionParameters()
+
+        for q in np.unique(self.qIndices):
+            q = int(q)
+            key = (q,) + parameters
+
+            spectrum = self.absorptionCache.get(key)
+            if spectrum is not None:
+                self.absorptionMapSpectra[q] = spectrum
+                continue
+
+            worker = Worker((self.absorptionMapJob,) + key, self.absorptionSpectrum, q, *parameters)
+            worker.signals.finished.connect(self.storeAbsorptionMapSpectrum)
+            worker.signals.failed.connect(self.discardAbsorptionMapSpectrum)
+
+            self.absorptionMapWorkers[q] = worker
+            self.threadPool.start(worker)
+
+        if len(self.absorptionMapWorkers) == 0:
+            self.assembleAbsorptionMap()
+
+    def cancelAbsorptionMap(self):
+        for q in list(self.absorptionMapWorkers.keys()):
+            self.retireWorker(self.absorptionMapWorkers.pop(q))
+
+        self.absorptionMapSpectra = {}
+
+    @Slot()
+    def storeAbsorptionMapSpectrum(self, key, spectrum):
+        job, q = key[0], key[1]
+        if job != self.absorptionMapJob:
+            return
+
+        self.absorptionMapWorkers.pop(q, None)
+        self.absorptionMapSpectra[q] = spectrum
+
+        if key[2:] == self.absorptionParameters():
+            self.absorptionCache.put(key[1:], spectrum, cost = spectrum['seconds'])
+
+        if len(self.absorptionMapWorkers) == 0:
+            self.assembleAbsorptionMap()
+
+    @Slot()
+    def discardAbsorptionMapSpectrum(self, key, message):
+        job, q = key[0], key[1]
+        if job != self.absorptionMapJob:
+            return
+
+        self.absorptionMapWorkers.pop(q, None)
+
+        if len(self.absorptionMapWorkers) == 0:
+            self.assembleAbsorptionMap()
+
+    def assembleAbsorptionMap(self):
+        if len(self.absorptionMapSpectra) == 0:
+            return
+
+        energy = next(iter(self.absorptionMapSpectra.values()))['energy']
+
+        # Rows ordered by path distance, missing spectra left empty
+        order = np.argsort(self.collinearDistances, kind = 'stable')
+        distances = self.collinearDistances[order]
+
+        rows = np.zeros((len(order), len(energy)))
+        for row, index in enumerate(order):
+            spectrum = self.absorptionMapSpectra.get(int(self.qIndices[index]))
+            if spectrum is not None and len(spectrum['absorption']) == len(energy):
+                rows[row] = spectrum['absorption']
+
+        # Resample onto a uniform grid along the path, taking the nearest Q-point
+        xMin, xMax = distances[0], distances[-1]
+        if xMax > xMin:
+            xGrid = np.linspace(xMin, xMax, self.absorptionMapWidth)
+            nearest = np.clip(np.searchsorted(distances, xGrid), 1, len(distances) - 1)
+            nearest -= (xGrid - distances[nearest - 1]) < (distances[nearest] - xGrid)
+            image = rows[nearest]
+        else:
+            xMax = xMin + 1.0
+            image = rows[:1]
+
+        self.excitonAbsorptionMapReady.emit(image, (xMin, xMax), (energy[0], energy[-1]))
+        self.finishOperation('absorptionMap')
+
     @Slot()
     def recomputeAbsorptionSpectra(self):
         newExcAbsData = []
@@ -185,6 +1453,11 @@ class Calculations(QObject):
         self.excAbsData = newExcAbsData
         self.excitonAbsorptionReady.emit(self.excAbsData, self.showExcitonLabels)
 
+        self.memoryBudget.enforce()
+
+        if self.absorptionMapRequested:
+            self.computeAbsorptionMap()
+
     @Slot()
     def emitExcitonAbsorption(self):
         self.excitonAbsorptionReady.emit(self.excAbsData, self.showExcitonLabels)
@@ -205,41 +1478,124 @@ class Calculations(QObject):
 
         self.qPathReady.emit(self.options.qBZ.special_kpoints_distances(merge_sections=True), self.options.qBZ.path_labels_list(merge_sections=True))
 
+    def kMinusQIndexMap(self, iq, carQPoint):
+        indices = self.kMinusQIndices.get(iq)
+        if indices is not None:
+            return indices
+
+        # Reduced coordinates folded into [0, 1) so that k-points are matched modulo reciprocal lattice vectors
+        if self.kPointTree is None:
+            self.kPointTree = cKDTree(np.mod(np.round(self.lattice.red_kpoints, 8), 1.0), boxsize = 1.0)
+
+        start = perf_counter()
+
+        redQPoint = car_red(np.array([carQPoint]), self.lattice.rlat)[0]
+        distances, indices = self.kPointTree.query(np.mod(np.round(self.lattice.red_kpoints - redQPoint, 8), 1.0))
+
+        self.kMinusQIndices.put(iq, indices, cost = perf_counter() - start)
+        return indices
+
     @Slot()
     def getExcitonBandStructure(self, points, dummy):
-        if np.all(self.collinear_qpoints[points[0].data().i] == [0.0, 0.0, 0.0]):
-            excitonDB = YamboExcitonDB.from_db_file(self.lattice, filename='ndb.BS_diago_Q1', folder=self.options.diagoDir)
-            qpDB = YamboQPDB.from_db(folder=self.options.qpDir)
+        iq = int(self.qIndices[points[0].data().i])
+        excitonIndices = tuple(point.data().j for point in points)
 
-            excitonIndices = tuple(point.data().j for point in points)
+        kMinusQ = self.kMinusQIndexMap(iq, self.carQPoints[iq])
 
-            excitonBands = excitonDB.interpolate(energies=qpDB, excitons=excitonIndices, bz=self.options.qBZ, lpratio=10, verbose=False)
+        self.scheduler.submit('bandStructure', self.excitonBandStructure, (self.lattice, iq, self.dispersionDiagoDir, self.options.qpDir, excitonIndices, self.options.qBZ, kMinusQ, self.realType()), self.setExcitonBandStructure)
 
-            self.k = calculate_distances(red_car(excitonBands.kpoints, self.lattice.rlat))
-            self.bands = np.transpose(excitonBands.bands)
-            self.weights = np.transpose(excitonBands.weights)
-        else:
-            self.k = []
-            self.bands = []
-            self.weights = []
+    def excitonBandStructure(self, lattice, iq, diagoDir, qpDir, excitonIndices, bz, kMinusQ, realType):
+        try:
+            excitonDB = FiniteQExcitonDB.from_db_file(lattice, filename=f'ndb.BS_diago_Q{iq + 1}', folder=diagoDir)
+        except (OSError, RuntimeError, KeyError, IndexError, ValueError):
+            excitonDB = None
+
+        if excitonDB is None or excitonDB.eigenvectors is None:
+            return [], [], []
+
+        # yambopy reads the eigenvectors in double precision, only the weights it returns are converted
+        excitonDB.kMinusQ = kMinusQ
+
+        qpDB = YamboQPDB.from_db(folder=qpDir)
+
+        excitonBands = excitonDB.interpolate(energies=qpDB, excitons=excitonIndices, bz=bz, lpratio=10, verbose=False)
+
+        k = self.realArray(calculate_distances(red_car(excitonBands.kpoints, lattice.rlat)), realType)
+        bands = self.realArray(np.transpose(excitonBands.bands), realType)
+        weights = self.realArray(np.transpose(excitonBands.weights), realType)
+
+        return k, bands, weights
+
+    def setExcitonBandStructure(self, result):
+        self.k, self.bands, self.weights = result
 
         self.excitonBandStructureNumCurvesChanged.emit(len(self.bands))
         self.excitonBandStructureInit.emit()
         self.emitExcitonBandStructure()
 
     @Slot()
-    def setWeightFactor(self, factor):
-        self.weightFactor = factor
-        if len(self.k) > 0:
-            self.excitonBandStructureReady.emit(self.k, self.bands, self.weights * self.weightFactor)
+    def getExcitonWeightMap(self, points, dummy):
+        iq = int(self.qIndices[points[0].data().i])
+        excitonIndices = np.array([point.data().j for point in points])
+
+        weights = self.excitonWeightCache.get(iq)
+
+        if weights is None:
+            self.scheduler.submit('weightMap', self.excitonKWeights, (self.lattice, iq, self.dispersionDiagoDir, self.realType()), partial(self.storeExcitonKWeights, iq, excitonIndices))
+        else:
+            # Another exciton of an already read Q-point only gathers weights
+            self.scheduler.cancel('weightMap')
+            self.emitExcitonWeightMap(weights, excitonIndices)
+
+    def excitonKWeights(self, lattice, iq, diagoDir, realType):
+        # Eigenvectors are read straight into the working precision
+        table, eigenvectors = self.readExcitonEigenvectors(diagoDir, iq, None, realType)
+
+        return kWeights(table[:, 0] - 1, eigenvectors, lattice.nkpoints, realType)
+
+    def storeExcitonKWeights(self, iq, excitonIndices, weights):
+        self.excitonWeightCache.put(iq, weights, cost = self.scheduler.seconds.get('weightMap', 0.0))
+        self.emitExcitonWeightMap(weights, excitonIndices)
+
+    def unfoldedWeightMapPoints(self):
+        if self.weightMapPoints is None:
+            rlat = np.asarray(self.lattice.rlat)
+            radius = max(np.linalg.norm(rlat[0]), np.linalg.norm(rlat[1]))
+            tolerance = 1.0e-4 * radius
+
+            # Star of every k-point, plus its in-plane periodic images
+            points, owners = expandBySymmetry(self.lattice.car_kpoints, self.lattice.sym_car)
+            numImages = len(points) // max(self.lattice.nkpoints, 1)
+
+            shifts = np.array([i * rlat[0] + j * rlat[1] for i in (0, -1, 1) for j in (0, -1, 1)])
+            points = (points[np.newaxis, :, :] + shifts[:, np.newaxis, :]).reshape(-1, 3)
+            owners = np.tile(owners, len(shifts))
+
+            # A position reached by several images keeps the k-point that lands there without a symmetry operation
+            images = np.tile(np.arange(numImages), len(owners) // numImages)
+            priority = images * len(shifts) + np.repeat(np.arange(len(shifts)), len(owners) // len(shifts))
+
+            # The kz = 0 plane, within one reciprocal lattice vector of Gamma
+            inPlane = (np.abs(points[:, 2]) < tolerance) & (np.linalg.norm(points[:, :2], axis = 1) <= radius + tolerance)
+            order = np.flatnonzero(inPlane)[np.argsort(priority[inPlane], kind = 'stable')]
+            points = points[order, :2]
+            owners = owners[order]
+
+            unique, first = np.unique(np.rint(points / tolerance).astype(np.int64), axis = 0, return_index = True)
+
+            self.weightMapPoints = self.realArray(points[first])
+            self.weightMapOwners = owners[first]
+
+        return self.weightMapPoints, self.weightMapOwners
+
+    def emitExcitonWeightMap(self, weights, excitonIndices):
+        points, owners = self.unfoldedWeightMapPoints()
+        self.excitonWeightMapReady.emit(points, weights[excitonIndices - 1].sum(axis = 0)[owners])
 
     @Slot()
     def emitExcitonBandStructure(self):
-        scaledWeights = []
-        if len(self.weights) > 0:
-            scaledWeights = self.weights * self.weightFactor
-
-        self.excitonBandStructureReady.emit(self.k, self.bands, scaledWeights)
+        # Weights are scaled by the band structure widget itself
+        self.excitonBandStructureReady.emit(self.k, self.bands, self.weights)
 
     @Slot()
     def toggleExcitonLabelsVisibility(self, visible):
@@ -1,4 +1,5 @@
-from PySide6.QtCore import Signal, Slot, Qt
+from PySide6.QtCore import Signal, Slot, Qt, QTimer
+from item_pool import ItemPool, Same, penKey
 import pyqtgraph as pg
 import numpy as np
 
@@ -6,6 +7,7 @@ import numpy as np
 class DispersionWidget(pg.PlotWidget):
     qPointSelected = Signal(list, bool)
     curveClicked = Signal(int)
+    visibleRangeChanged = Signal(float, float, int)
 
     def __init__(self, style, parent = None):
         pg.PlotWidget.__init__(self, parent)
@@ -47,34 +49,123 @@ class DispersionWidget(pg.PlotWidget):
 
         self.style.axesStyle.axesWidthChanged.connect(self.setAxesWidth)
 
-        self.curveItems = []
+        # Items are kept between replots and only updated when their data or style change
+        self.curvePool = ItemPool(self, self.newCurveItem)
+        self.linePool = ItemPool(self, self.newLineItem)
+        self.pointPool = ItemPool(self, self.newScatterItem)
+
+        # Excitons matching the search, drawn over the points
+        self.highlightItem = pg.ScatterPlotItem(pxMode = True, symbol = 'o', size = 14, pen = pg.mkPen('y', width = 2), brush = None)
+        self.highlightItem.setZValue(10)
+        self.addItem(self.highlightItem)
+
+        # Streamed points are buffered and drawn at a fixed frame rate
+        self.pendingPoints = []
+        self.pendingPointsData = []
+
+        self.streamTimer = QTimer()
+        self.streamTimer.setSingleShot(True)
+        self.streamTimer.setInterval(1000 // 30)
+        self.streamTimer.timeout.connect(self.flushPendingPoints)
+
+        # Interpolated curves are re-evaluated over the visible range once zooming or panning settles
+        self.visibleRange = None
+
+        self.rangeTimer = QTimer()
+        self.rangeTimer.setSingleShot(True)
+        self.rangeTimer.setInterval(200)
+        self.rangeTimer.timeout.connect(self.emitVisibleRange)
+
+        self.getViewBox().sigXRangeChanged.connect(self.scheduleVisibleRange)
+        self.getViewBox().sigResized.connect(self.scheduleVisibleRange)
+
+    def newCurveItem(self):
+        dataItem = pg.PlotDataItem(symbol=None)
+        dataItem.curve.setClickable(True)
+        dataItem.sigClicked.connect(self.curveSelected)
+        return dataItem
+
+    def newLineItem(self):
+        return pg.InfiniteLine(angle = 0, movable = False, pen = 'w')
+
+    def newScatterItem(self):
+        scatterPlotItem = pg.ScatterPlotItem(pxMode=True)
+        scatterPlotItem.sigClicked.connect(self.getSelectedQPoints)
+        return scatterPlotItem
+
+    def setCurveData(self, dataItem, x, y, pen):
+        dataItem.setData(x=x, y=y)
+        dataItem.setPen(pen)
 
     @Slot()
     def plotData(self, points, pointsData, xInter, yInter):
-        self.clear()
-        self.curveItems.clear()
+        # Streamed points not drawn yet belong to the pooled scatter items
+        self.streamTimer.stop()
+        self.flushPendingPoints()
 
         curvePens = self.style.curveStyle.curvePens
         pointSymbols = self.style.pointStyle.pointSymbols
         pointSizes = self.style.pointStyle.pointSizes
 
+        self.curvePool.begin()
         for i in range(len(yInter)):
-            dataItem = pg.PlotDataItem(x=xInter, y=yInter[i], pen=curvePens[i], symbol=None)
-            dataItem.curve.setClickable(True)
-            dataItem.sigClicked.connect(self.curveSelected)
-
-            self.addItem(dataItem)
-            self.curveItems.append(dataItem)
+            self.curvePool.update(('curve', i), (xInter, yInter[i], penKey(curvePens[i])), lambda item, i=i: self.setCurveData(item, xInter, yInter[i], curvePens[i]))
+        self.curvePool.end()
 
-        if self.singleQPoint:
+        self.linePool.begin()
+        if self.singleQPoint and len(points) > 0 and len(points[0]) > 0:
             for i, y in enumerate(np.array(points)[:, 1]):
-                line = pg.InfiniteLine(pos = y, angle = 0, movable = False, pen = 'w')
-                self.addItem(line)
+                self.linePool.update(('line', i), y, lambda item, y=y: item.setPos(y))
+        self.linePool.end()
 
+        self.pointPool.begin()
         for i in range(len(points)):
-            scatterPlotItem = pg.ScatterPlotItem(pos=points[i], data=pointsData[i], symbol=pointSymbols[i], pxMode=True, size=pointSizes[i])
-            scatterPlotItem.sigClicked.connect(self.getSelectedQPoints)
-            self.addItem(scatterPlotItem)
+            self.pointPool.update(('points', i), (points[i], Same(pointsData[i]), pointSymbols[i], pointSizes[i]), lambda item, i=i: item.setData(pos=points[i], data=pointsData[i], symbol=pointSymbols[i], size=pointSizes[i]))
+        self.pointPool.end()
+
+        # Follow the points as they are streamed in
+        if len(points) > 0 and all(len(curvePoints) == 0 for curvePoints in points):
+            self.enableAutoRange()
+
+    @Slot()
+    def highlightPoints(self, x, y):
+        self.highlightItem.setData(x = x, y = y)
+
+    @Slot()
+    def appendPoints(self, points, pointsData):
+        if len(self.pendingPoints) != len(points):
+            self.pendingPoints = [[] for i in range(len(points))]
+            self.pendingPointsData = [[] for i in range(len(points))]
+
+        for i in range(len(points)):
+            self.pendingPoints[i].extend(points[i])
+            self.pendingPointsData[i].extend(pointsData[i])
+
+        if not self.streamTimer.isActive():
+            self.streamTimer.start()
+
+    @Slot()
+    def flushPendingPoints(self):
+        for i in range(len(self.pendingPoints)):
+            scatterPlotItem = self.pointPool.items.get(('points', i))
+            if scatterPlotItem is not None and len(self.pendingPoints[i]) > 0:
+                scatterPlotItem.addPoints(pos=self.pendingPoints[i], data=self.pendingPointsData[i])
+
+        self.pendingPoints.clear()
+        self.pendingPointsData.clear()
+
+    @Slot()
+    def scheduleVisibleRange(self):
+        self.rangeTimer.start()
+
+    @Slot()
+    def emitVisibleRange(self):
+        xMin, xMax = self.getViewBox().viewRange()[0]
+        width = int(self.getViewBox().width())
+
+        if (xMin, xMax, width) != self.visibleRange:
+            self.visibleRange = (xMin, xMax, width)
+            self.visibleRangeChanged.emit(xMin, xMax, width)
 
     @Slot()
     def getSelectedQPoints(self, item, points, ev):
@@ -82,7 +173,9 @@ class DispersionWidget(pg.PlotWidget):
 
     @Slot()
     def curveSelected(self, item, ev):
-        self.curveClicked.emit(self.curveItems.index(item))
+        key = self.curvePool.keyOf(item)
+        if key is not None:
+            self.curveClicked.emit(key[1])
 
     @Slot()
     def setSingleQPoint(self, nQPoints):
@@ -0,0 +1,78 @@
+from exciton_dos import evaluateStars, chunkSize
+import numpy as np
+
+
+
+# Reduced axes spanning each plane through Gamma
+MAP_PLANES = {'b1-b2': (0, 1), 'b1-b3': (0, 2), 'b2-b3': (1, 2)}
+
+
+
+def planeBasis(rlat, axes):
+    # Orthonormal in-plane directions, the first one along the first reciprocal vector
+    a, b = np.asarray(rlat, dtype = np.float64)[list(axes)]
+
+    e1 = a / np.linalg.norm(a)
+    e2 = b - (b @ e1) * e1
+    e2 /= np.linalg.norm(e2)
+
+    return np.array([e1, e2])
+
+
+
+def pixelTransform(rlat, axes, size):
+    # Affine map from pixel to in-plane coordinates (m11, m12, m21, m22, dx, dy), pixel centers on the reduced grid
+    basis = planeBasis(rlat, axes)
+    a, b = np.asarray(rlat, dtype = np.float64)[list(axes)] @ basis.T
+
+    offset = -(0.5 / size + 0.5) * (a + b)
+
+    return (a[0] / size, a[1] / size, b[0] / size, b[1] / size, offset[0], offset[1])
+
+
+
+def planeKPoints(axes, size, i, j):
+    # Reduced coordinates of pixels (i, j) of a size x size grid centered at Gamma
+    kpoints = np.zeros((len(i), 3))
+    kpoints[:, axes[0]] = i / size - 0.5
+    kpoints[:, axes[1]] = j / size - 0.5
+    return kpoints
+
+
+
+def mapSizes(size, coarsest = 16):
+    # Halvings of the final size, coarse first
+    sizes = [size]
+    while sizes[0] // 2 >= coarsest:
+        sizes.insert(0, sizes[0] // 2)
+    return sizes
+
+
+
+def streamEnergyMap(arrays, axes, size):
+    # Yields (fraction done, energies[size, size, bands]) of ever finer grids; points shared with the coarser grid are not evaluated again
+    sizes = mapSizes(size)
+    batch = chunkSize(arrays)
+
+    energies = None
+
+    for level, n in enumerate(sizes):
+        i, j = np.meshgrid(np.arange(n), np.arange(n), indexing = 'ij')
+
+        refined = np.zeros((n, n, len(arrays[0])))
+        missing = np.ones((n, n), dtype = bool)
+
+        if energies is not None and n == 2 * len(energies):
+            refined[::2, ::2] = energies
+            missing[::2, ::2] = False
+
+        i, j = i[missing], j[missing]
+        values = np.empty((len(i), refined.shape[2]))
+
+        for start in range(0, len(i), batch):
+            values[start:start + batch] = evaluateStars(arrays, planeKPoints(axes, n, i[start:start + batch], j[start:start + batch]))
+
+        refined[missing] = values
+        energies = refined
+
+        yield (level + 1) / len(sizes), energies
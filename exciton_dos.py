@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import multiprocessing
+import numpy as np
+import os
+
+
+
+# Fit arrays of the pool process, set once by its initializer
+fitArrays = None
+
+
+
+def skwArrays(skw):
+    # What the star function expansion needs, cheaper to send to other processes than the interpolator itself
+    return np.asarray(skw.coefs[0]), np.asarray(skw.rpts, dtype = np.float64), np.asarray(skw.ptg_symrel, dtype = np.float64)
+
+
+
+def evaluateStars(arrays, kpoints):
+    # Energies of all bands at all kpoints (reduced coordinates) at once, instead of one k-point at a time
+    coefs, rpts, symrel = arrays
+
+    # In the precision of the arrays given, single precision ones give single precision energies
+    stars = np.zeros((len(kpoints), len(rpts)), dtype = np.result_type(kpoints, rpts, np.complex64))
+    for omat in symrel:
+        stars += np.exp(2.0j * np.pi * ((kpoints @ omat) @ rpts.T))
+    stars /= len(symrel)
+
+    return (stars @ coefs.T).real
+
+
+
+def gridShape(redKpoints, size):
+    # Directions sampled by a single k-point in the BSE mesh, like the vacuum of a layer, are not sampled either
+    redKpoints = np.asarray(redKpoints)
+    return tuple(size if len(np.unique(np.round(redKpoints[:, i] % 1.0, 6))) > 1 else 1 for i in range(3))
+
+
+
+def gridPoints(shape, start, stop):
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    return np.column_stack([index / n for index, n in zip(indices, shape)])
+
+
+
+def initializeProcess(arrays):
+    global fitArrays
+    fitArrays = arrays
+
+
+
+def histogramChunk(shape, start, stop, edges):
+    energies = evaluateStars(fitArrays, gridPoints(shape, start, stop))
+    return np.histogram(energies, bins = edges)[0]
+
+
+
+def chunkSize(arrays, maxElements = 1 << 22):
+    # Grid points per chunk, so that the star functions of a chunk stay within maxElements
+    return max(1, maxElements // max(len(arrays[1]), 1))
+
+
+
+def streamHistogram(arrays, shape, edges, processes = None, chunkPoints = None):
+    # Yields (fraction done, counts so far) while the uniform grid is evaluated chunk by chunk in a process pool
+    numPoints = int(np.prod(shape))
+    processes = processes or max(1, (os.cpu_count() or 2) - 1)
+    chunkPoints = chunkPoints or chunkSize(arrays)
+
+    chunks = iter(range(0, numPoints, chunkPoints))
+    counts = np.zeros(len(edges) - 1, dtype = np.int64)
+    done = 0
+
+    # Spawned processes do not inherit the threads of the application
+    executor = ProcessPoolExecutor(processes, mp_context = multiprocessing.get_context('spawn'), initializer = initializeProcess, initargs = (arrays,))
+
+    try:
+        pending = {}
+
+        # Only a few chunks are in flight, so memory does not grow with the grid
+        while True:
+            while len(pending) < 2 * processes:
+                start = next(chunks, None)
+                if start is None:
+                    break
+
+                stop = min(start + chunkPoints, numPoints)
+                pending[executor.submit(histogramChunk, shape, start, stop, edges)] = stop - start
+
+            if len(pending) == 0:
+                break
+
+            finished, unfinished = wait(pending, return_when = FIRST_COMPLETED)
+
+            for future in finished:
+                counts += future.result()
+                done += pending.pop(future)
+
+            yield done / numPoints, counts.copy()
+    finally:
+        executor.shutdown(wait = False, cancel_futures = True)
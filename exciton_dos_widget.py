@@ -0,0 +1,34 @@
+from PySide6.QtCore import Slot
+import pyqtgraph as pg
+
+
+class ExcitonDOSWidget(pg.PlotWidget):
+    def __init__(self, parent = None):
+        pg.PlotWidget.__init__(self, parent)
+
+        self.title = 'Exciton Density of States'
+        self.setTitle(self.title)
+
+        self.showAxes(True)
+
+        self.setLabel('bottom', text = 'Energy', units = 'eV')
+        self.setLabel('left', text = 'DOS', units = 'States/eV')
+
+        self.curveItem = self.plot(pen = pg.mkPen('w', width = 2))
+
+    @Slot()
+    def plotData(self, energies, dos, fraction):
+        self.curveItem.setData(energies, dos)
+        self.curveItem.show()
+
+        # The grid is still being evaluated
+        if fraction < 1.0:
+            self.setTitle(f'{self.title} ({100.0 * fraction:.0f}%)')
+        else:
+            self.setTitle(self.title)
+
+    @Slot()
+    def clearData(self):
+        self.curveItem.clear()
+        self.curveItem.hide()
+        self.setTitle(self.title)
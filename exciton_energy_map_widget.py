@@ -0,0 +1,67 @@
+from PySide6.QtCore import Signal, Slot, Qt
+from PySide6.QtGui import QTransform
+import pyqtgraph as pg
+
+
+class ExcitonEnergyMapWidget(pg.GraphicsLayoutWidget):
+    pointClicked = Signal(float, float)
+
+    def __init__(self, parent = None):
+        pg.GraphicsLayoutWidget.__init__(self, parent)
+
+        self.map = self.addPlot(0, 0)
+
+        self.title = 'Exciton Energy Map'
+        self.map.setTitle(self.title)
+
+        self.map.showAxes(True)
+        self.map.setAspectLocked(True)
+
+        self.map.setLabel('bottom', text = 'q_1')
+        self.map.setLabel('left', text = 'q_2')
+
+        self.imageItem = pg.ImageItem(axisOrder = 'col-major')
+        self.map.addItem(self.imageItem)
+
+        self.histogram = pg.HistogramLUTItem()
+        self.histogram.setImageItem(self.imageItem)
+        self.histogram.gradient.loadPreset('viridis')
+        self.addItem(self.histogram, 0, 1)
+
+        self.hasImage = False
+
+        self.scene().sigMouseClicked.connect(self.selectPoint)
+
+    @Slot()
+    def plotData(self, image, transform, fraction):
+        self.imageItem.setImage(image, autoLevels = not self.hasImage)
+        self.imageItem.setTransform(QTransform(*transform))
+        self.imageItem.show()
+
+        # Levels follow the finer grids until the last one
+        if fraction < 1.0:
+            self.map.setTitle(f'{self.title} ({100.0 * fraction:.0f}%)')
+            self.histogram.setLevels(image.min(), image.max())
+        else:
+            self.map.setTitle(self.title)
+
+        self.hasImage = True
+
+    @Slot()
+    def clearData(self):
+        self.imageItem.clear()
+        self.imageItem.hide()
+        self.map.setTitle(self.title)
+
+        self.hasImage = False
+
+    @Slot()
+    def selectPoint(self, event):
+        if not self.hasImage or event.button() != Qt.MouseButton.LeftButton:
+            return
+
+        if not self.map.vb.sceneBoundingRect().contains(event.scenePos()):
+            return
+
+        point = self.map.vb.mapSceneToView(event.scenePos())
+        self.pointClicked.emit(point.x(), point.y())
@@ -0,0 +1,116 @@
+import numpy as np
+import re
+
+
+
+# Orderings of the matches, and the column sorted by
+SEARCH_ORDERS = {'lowest': ('energy', False), 'highest': ('energy', True), 'darkest': ('intensity', False), 'brightest': ('intensity', True)}
+
+COMPARISON = re.compile(r'^([eiq])(<=|>=|<|>|=)([-+0-9.eE]+)$')
+WINDOW = re.compile(r'^([-+]?[0-9.]+)(?:-|\.\.)([-+]?[0-9.]+)$')
+
+
+
+def buildIndex(perQ):
+    # Columns of every exciton of every Q-point, sorted by energy
+    qIndices = sorted(perQ.keys())
+
+    energies = [np.asarray(perQ[iq][0], dtype = np.float64) for iq in qIndices]
+    intensities = [np.asarray(perQ[iq][1], dtype = np.float64) for iq in qIndices]
+
+    index = {
+        'q': np.repeat(np.array(qIndices, dtype = np.int32), [len(e) for e in energies]),
+        'exciton': np.concatenate([np.arange(1, len(e) + 1, dtype = np.int32) for e in energies]) if len(energies) > 0 else np.zeros(0, dtype = np.int32),
+        'energy': np.concatenate(energies) if len(energies) > 0 else np.zeros(0),
+        'intensity': np.concatenate(intensities) if len(intensities) > 0 else np.zeros(0),
+        # Relative to the brightest exciton of the same Q-point, as the absorption spectra tell bright from dark
+        'qIntensity': np.concatenate([i / np.max(i) if len(i) > 0 and np.max(i) > 0 else i for i in intensities]) if len(intensities) > 0 else np.zeros(0)
+    }
+
+    # Relative to the brightest exciton of all Q-points
+    if len(index['intensity']) > 0 and np.max(index['intensity']) > 0:
+        index['intensity'] = index['intensity'] / np.max(index['intensity'])
+
+    order = np.argsort(index['energy'], kind = 'stable')
+    return {column: values[order] for column, values in index.items()}
+
+
+
+def parseQuery(text):
+    # Energy bounds, extra (column, operator, value) conditions, brightness, ordering and number of matches
+    query = {'energyMin': -np.inf, 'energyMax': np.inf, 'conditions': [], 'brightness': None, 'order': None, 'count': None}
+
+    tokens = text.replace(',', ' ').lower().split()
+
+    for i, token in enumerate(tokens):
+        window = WINDOW.match(token)
+        comparison = COMPARISON.match(token)
+
+        if window is not None:
+            low, high = sorted((float(window.group(1)), float(window.group(2))))
+            query['energyMin'] = max(query['energyMin'], low)
+            query['energyMax'] = min(query['energyMax'], high)
+        elif comparison is not None:
+            column, operator, value = comparison.groups()
+            value = float(value)
+
+            # Energy bounds narrow the sorted slice, the condition keeps strict comparisons strict
+            if column == 'e' and operator in ('>', '>='):
+                query['energyMin'] = max(query['energyMin'], value)
+            elif column == 'e' and operator in ('<', '<='):
+                query['energyMax'] = min(query['energyMax'], value)
+
+            # Q-points are numbered as the ndb.BS_diago_Q files
+            query['conditions'].append(({'e': 'energy', 'i': 'intensity', 'q': 'q'}[column], operator, value - 1 if column == 'q' else value))
+        elif token in ('bright', 'dark'):
+            query['brightness'] = token
+        elif token in SEARCH_ORDERS:
+            query['order'] = token
+            if query['count'] is None:
+                query['count'] = 1
+        elif token.isdigit() and i > 0 and tokens[i - 1] in SEARCH_ORDERS:
+            query['count'] = int(token)
+        else:
+            raise ValueError(token)
+
+    return query
+
+
+
+def searchIndex(index, query, minIntensity):
+    # Positions in the index of the matching excitons, in the order asked for
+    start = np.searchsorted(index['energy'], query['energyMin'], side = 'left')
+    stop = np.searchsorted(index['energy'], query['energyMax'], side = 'right')
+
+    matches = np.arange(start, stop)
+    mask = np.ones(len(matches), dtype = bool)
+
+    for column, operator, value in query['conditions']:
+        values = index[column][matches]
+        if operator == '<':
+            mask &= values < value
+        elif operator == '<=':
+            mask &= values <= value
+        elif operator == '>':
+            mask &= values > value
+        elif operator == '>=':
+            mask &= values >= value
+        else:
+            mask &= np.isclose(values, value)
+
+    if query['brightness'] == 'bright':
+        mask &= index['qIntensity'][matches] >= minIntensity
+    elif query['brightness'] == 'dark':
+        mask &= index['qIntensity'][matches] < minIntensity
+
+    matches = matches[mask]
+
+    if query['order'] is not None:
+        column, descending = SEARCH_ORDERS[query['order']]
+        values = index[column][matches]
+        matches = matches[np.argsort(-values if descending else values, kind = 'stable')]
+
+    if query['count'] is not None:
+        matches = matches[:query['count']]
+
+    return matches
@@ -0,0 +1,37 @@
+from PySide6.QtCore import Slot
+import numpy as np
+import pyqtgraph as pg
+
+
+class ExcitonWeightMapWidget(pg.PlotWidget):
+    def __init__(self, parent = None):
+        pg.PlotWidget.__init__(self, parent)
+
+        self.title = 'Exciton Weight Map'
+        self.setTitle(self.title)
+
+        self.showAxes(True)
+        self.setAspectLocked(True)
+
+        self.setLabel('bottom', text = 'k_x')
+        self.setLabel('left', text = 'k_y')
+
+        self.colorMap = pg.colormap.get('inferno')
+
+        self.scatterItem = pg.ScatterPlotItem(pen = None, size = 8, symbol = 's')
+        self.addItem(self.scatterItem)
+
+    @Slot()
+    def plotData(self, positions, weights):
+        maxWeight = np.max(weights) if len(weights) > 0 else 0.0
+        levels = weights / maxWeight if maxWeight > 0.0 else np.zeros(len(weights))
+
+        brushes = [pg.mkBrush(color) for color in self.colorMap.map(levels, mode = 'qcolor')]
+
+        self.scatterItem.setData(x = positions[:, 0], y = positions[:, 1], brush = brushes)
+        self.scatterItem.show()
+
+    @Slot()
+    def clearData(self):
+        self.scatterItem.clear()
+        self.scatterItem.hide()
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+
+def complexType(realType):
+    # complex64 for float32, complex128 for float64
+    return np.result_type(realType, np.complex64)
+
+
+
+def complexArray(pairs, realType):
+    # Complex array of the working precision from (real, imaginary) pairs along the last axis, without a double precision copy
+    pairs = np.asarray(pairs)
+    target = complexType(realType)
+
+    if pairs.dtype.itemsize * 2 == target.itemsize and pairs.flags.c_contiguous:
+        return pairs.view(target)[..., 0]
+
+    array = np.empty(pairs.shape[:-1], dtype = target)
+    array.real = pairs[..., 0]
+    array.imag = pairs[..., 1]
+
+    return array
+
+
+
+def kWeights(kIndices, eigenvectors, nkpoints, realType, maxElements = 1 << 22):
+    # Sum of |A|^2 over the transitions of each k-point, for all excitons at once, accumulated over chunks of at most maxElements (excitons x transitions)
+    eigenvectors = np.asarray(eigenvectors)
+    kIndices = np.asarray(kIndices)
+
+    chunk = max(1, maxElements // max(len(eigenvectors), 1))
+
+    weights = np.zeros((len(eigenvectors), nkpoints), dtype = realType)
+
+    for start in range(0, len(kIndices), chunk):
+        block = eigenvectors[:, start:start + chunk]
+        k = kIndices[start:start + chunk]
+
+        # Transitions of the chunk grouped by k
+        order = np.argsort(k, kind = 'stable')
+        k = k[order]
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+
+        amplitudes = np.abs(block[:, order]) ** 2
+        weights[:, k[starts]] += np.add.reduceat(amplitudes, starts, axis = 1)
+
+    return weights
@@ -0,0 +1,104 @@
+from exciton_dos import evaluateStars
+from path_sampling import pathKPoints
+import numpy as np
+
+
+
+EXTREMA_COLUMNS = ['Band', 'Type', 'Position', 'Point', 'Energy (eV)', 'Effective Mass (m_e)']
+
+
+
+def candidateExtrema(x, energies):
+    # Samples lower (higher) than both neighbours within a connected section; ends of sections compare with their only neighbour
+    steps = np.diff(x) > 0
+
+    left = np.r_[False, steps]
+    right = np.r_[steps, False]
+
+    previous = np.concatenate((energies[:, :1], energies[:, :-1]), axis = 1)
+    following = np.concatenate((energies[:, 1:], energies[:, -1:]), axis = 1)
+
+    isolated = ~(left | right)
+
+    minima = (~left | (energies < previous)) & (~right | (energies <= following)) & ~isolated
+    maxima = (~left | (energies > previous)) & (~right | (energies >= following)) & ~isolated
+
+    return minima, maxima
+
+
+
+def pathExtrema(x, energies, arrays, pathKPointsRed, pathDistances, numSamples = 9, endTolerance = 0.05):
+    # Band, type, position, energy and curvature (eV per squared path unit) of every extremum, refined on the fit around each sample
+    x = np.asarray(x, dtype = np.float64)
+    energies = np.asarray(energies, dtype = np.float64)
+
+    if len(x) < 3:
+        return []
+
+    minima, maxima = candidateExtrema(x, energies)
+
+    bands, samples = np.nonzero(minima | maxima)
+    isMinimum = minima[bands, samples]
+
+    if len(bands) == 0:
+        return []
+
+    # Window as wide as the largest gap to a neighbouring sample; at the ends of a section it lies on the side inside the path
+    gaps = np.diff(x)
+    start = ~np.r_[False, gaps > 0][samples]
+    end = ~np.r_[gaps > 0, False][samples]
+
+    leftGaps = np.where(start, 0.0, np.r_[0.0, gaps][samples])
+    rightGaps = np.where(end, 0.0, np.r_[gaps, 0.0][samples])
+    widths = np.maximum(leftGaps, rightGaps)
+
+    # Positions are centers + scales * offsets: centered windows inside a section, one-sided half windows at its ends
+    scales = np.where(start | end, 0.5 * widths, widths)
+    centers = x[samples] + np.where(start, scales, np.where(end, -scales, 0.0))
+
+    offsets = np.linspace(-1.0, 1.0, numSamples)
+
+    # The end of a section is approached from before the jump
+    nudge = np.where(end, 1.0e-9 * widths, 0.0)
+    kpoints = pathKPoints(pathKPointsRed, pathDistances, (centers[:, np.newaxis] + scales[:, np.newaxis] * offsets - nudge[:, np.newaxis]).ravel())
+    fitEnergies = evaluateStars(arrays, kpoints).reshape(len(samples), numSamples, -1)
+    local = fitEnergies[np.arange(len(samples)), :, bands].T
+
+    # One least squares parabola per extremum, all in the same call, in units of each window
+    a, b, c = np.polyfit(offsets, local, 2)
+
+    convex = np.where(isMinimum, a > 0, a < 0)
+    vertex = np.where(convex, -b / np.where(a != 0, 2 * a, 1.0), np.inf)
+
+    # At the end of a section the extremum is stationary only if the slope vanishes there, the vertex just past the end allowed for the fit error
+    low = np.where(start, -1.0 - 2.0 * endTolerance, -1.0)
+    high = np.where(end, 1.0 + 2.0 * endTolerance, 1.0)
+    inside = convex & (vertex >= low) & (vertex <= high)
+    vertex = np.clip(vertex, -1.0, 1.0)
+
+    # Otherwise the best sample is kept without a curvature: a band still sloping at the end of the path, or flat
+    edge = np.where(start, 0, np.where(end, numSamples - 1, np.where(isMinimum, np.argmin(local, axis = 0), np.argmax(local, axis = 0))))
+    vertex = np.where(inside, vertex, offsets[edge])
+
+    position = np.clip(centers + scales * vertex, x[0], x[-1])
+    energy = np.where(inside, a * vertex ** 2 + b * vertex + c, local[edge, np.arange(len(samples))])
+    curvature = np.where(inside, 2 * a / scales ** 2, np.nan)
+
+    # Extrema found from both neighbouring samples are the same one
+    order = np.lexsort((position, isMinimum, bands))
+    same = (np.diff(bands[order]) == 0) & (np.diff(isMinimum[order].astype(int)) == 0) & (np.diff(position[order]) <= 0.25 * np.minimum(widths[order][:-1], widths[order][1:]))
+    first = np.sort(order[np.r_[True, ~same]])
+
+    return [(int(bands[i]), bool(isMinimum[i]), float(position[i]), float(energy[i]), float(curvature[i])) for i in first]
+
+
+
+def effectiveMass(curvature, pathScale, ha2ev):
+    # In units of the electron mass, from d2E/dx2 in eV, with x in path units worth pathScale * 2 pi / bohr; blank without a curvature
+    if not np.isfinite(curvature):
+        return None
+
+    k2 = (2 * np.pi * pathScale) ** 2
+    secondDerivative = curvature / k2 / ha2ev
+
+    return 1.0 / secondDerivative if secondDerivative != 0 else np.inf
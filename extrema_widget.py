@@ -0,0 +1,61 @@
+from PySide6.QtCore import Slot, Qt
+from PySide6.QtWidgets import QWidget, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QHeaderView, QFileDialog, QSizePolicy
+from extrema import EXTREMA_COLUMNS
+import numpy as np
+import csv
+
+
+class ExtremaWidget(QWidget):
+    def __init__(self, parent = None):
+        QWidget.__init__(self, parent)
+
+        self.rows = []
+
+        self.tableWidget = QTableWidget(self)
+        self.tableWidget.setColumnCount(len(EXTREMA_COLUMNS))
+        self.tableWidget.setHorizontalHeaderLabels(EXTREMA_COLUMNS)
+        self.tableWidget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tableWidget.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tableWidget.setSortingEnabled(True)
+
+        self.exportButton = QPushButton("Export CSV")
+        self.exportButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+        self.exportButton.clicked.connect(self.exportCSV)
+
+        vLayout = QVBoxLayout()
+        vLayout.addWidget(self.tableWidget)
+        vLayout.addWidget(self.exportButton)
+        self.setLayout(vLayout)
+
+    @Slot()
+    def setRows(self, rows):
+        self.rows = rows
+
+        # Rows would move while being filled
+        self.tableWidget.setSortingEnabled(False)
+        self.tableWidget.setRowCount(len(rows))
+
+        for i, (band, kind, position, label, energy, mass) in enumerate(rows):
+            for j, value in enumerate((band, kind, position, label, energy, mass)):
+                item = QTableWidgetItem()
+
+                # Numbers are stored as such, so that they sort by value
+                if isinstance(value, float):
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(value, 4) if np.isfinite(value) else value)
+                else:
+                    item.setData(Qt.ItemDataRole.DisplayRole, value)
+
+                self.tableWidget.setItem(i, j, item)
+
+        self.tableWidget.setSortingEnabled(True)
+
+    @Slot()
+    def exportCSV(self):
+        fileName, selectedFilter = QFileDialog.getSaveFileName(self, "Export Extrema", "extrema.csv", "CSV Files (*.csv)")
+        if fileName == '':
+            return
+
+        with open(fileName, 'w', newline = '') as file:
+            writer = csv.writer(file)
+            writer.writerow(EXTREMA_COLUMNS)
+            writer.writerows(self.rows)
@@ -1,15 +1,26 @@
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QSplitter
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QSplitter, QTabWidget
 from dispersion_widget import DispersionWidget
 from band_structure_widget import BandStructureWidget
 from absorption_widget import AbsorptionWidget
+from absorption_map_widget import AbsorptionMapWidget
+from exciton_weight_map_widget import ExcitonWeightMapWidget
+from exciton_dos_widget import ExcitonDOSWidget
+from exciton_energy_map_widget import ExcitonEnergyMapWidget
+from extrema_widget import ExtremaWidget
 from parameters_widget import ParametersWidget
+from render_queue import RenderQueue
+from performance_hud import PerformanceHUD
 
 
 class GraphsWidget(QWidget):
     def __init__(self, options, calculations, dispersionStyle, absorptionStyle, bandStructureStyle):
         QWidget.__init__(self)
 
+        # Plots are redrawn at most once per event-loop turn, however many signals ask for it
+
+        self.renderQueue = RenderQueue(self)
+
         # Dispersion widget
 
         dispersionWidget = DispersionWidget(dispersionStyle)
@@ -18,32 +29,37 @@ class GraphsWidget(QWidget):
 
         calculations.qPathReady.connect(dispersionWidget.setXAxis)
         calculations.excitonDispersionRange.connect(dispersionWidget.setXYRange)
-        calculations.excitonDispersionReady.connect(dispersionWidget.plotData)
+        calculations.excitonDispersionReady.connect(self.renderQueue.deferred('dispersion', dispersionWidget.plotData))
+        calculations.excitonDispersionPointsAppended.connect(dispersionWidget.appendPoints)
 
         dispersionWidget.qPointSelected.connect(calculations.computeQPointAbsorptionSpectrum)
         dispersionWidget.qPointSelected.connect(calculations.getExcitonBandStructure)
+        dispersionWidget.qPointSelected.connect(calculations.getExcitonWeightMap)
         dispersionWidget.curveClicked.connect(dispersionStyle.setCurrentCurveIndex)
+        dispersionWidget.visibleRangeChanged.connect(calculations.interpolateVisibleRange)
+        calculations.excitonSearchResults.connect(self.renderQueue.deferred('search', dispersionWidget.highlightPoints))
 
         # Band structure widget
 
         bandStructureWidget = BandStructureWidget(bandStructureStyle)
 
         calculations.qPathReady.connect(bandStructureWidget.setXAxis)
-        calculations.excitonBandStructureReady.connect(bandStructureWidget.plotData)
-        calculations.excitonBandStructureClear.connect(bandStructureWidget.clearData)
+        calculations.excitonBandStructureReady.connect(self.renderQueue.deferred('bandStructure', bandStructureWidget.plotData))
+        calculations.excitonBandStructureClear.connect(self.renderQueue.deferred('bandStructure', bandStructureWidget.clearData))
 
         bandStructureWidget.curveClicked.connect(bandStructureStyle.setCurrentCurveIndex)
 
-        bandStructureStyle.weightFactorChanged.connect(calculations.setWeightFactor)
+        bandStructureStyle.weightFactorChanged.connect(bandStructureWidget.setWeightFactor)
 
         # Absorption widget
 
         absorptionWidget = AbsorptionWidget(absorptionStyle)
 
-        calculations.excitonAbsorptionReady.connect(absorptionWidget.plotData)
-        calculations.excitonAbsorptionClear.connect(absorptionWidget.clearData)
+        calculations.excitonAbsorptionReady.connect(self.renderQueue.deferred('absorption', absorptionWidget.plotData))
+        calculations.excitonAbsorptionClear.connect(self.renderQueue.deferred('absorption', absorptionWidget.clearData))
 
         absorptionWidget.excitonsSelected.connect(calculations.getExcitonBandStructure)
+        absorptionWidget.excitonsSelected.connect(calculations.getExcitonWeightMap)
         absorptionWidget.curveClicked.connect(absorptionStyle.setCurrentCurveIndex)
 
         absorptionStyle.legendStyle.textColorChanged.connect(absorptionWidget.setLegendTextColor)
@@ -52,19 +68,74 @@ class GraphsWidget(QWidget):
         absorptionStyle.legendStyle.borderPenChanged.connect(absorptionWidget.setLegendBorderPen)
         absorptionStyle.legendStyle.offsetChanged.connect(absorptionWidget.setLegendOffset)
 
+        # Absorption map widget
+
+        absorptionMapWidget = AbsorptionMapWidget()
+        absorptionMapWidget.map.setXLink(dispersionWidget.getPlotItem())
+
+        calculations.qPathReady.connect(absorptionMapWidget.setXAxis)
+        calculations.excitonAbsorptionMapReady.connect(self.renderQueue.deferred('absorptionMap', absorptionMapWidget.plotData))
+        calculations.excitonAbsorptionMapClear.connect(self.renderQueue.deferred('absorptionMap', absorptionMapWidget.clearData))
+
+        # Exciton weight map widget
+
+        weightMapWidget = ExcitonWeightMapWidget()
+
+        calculations.excitonWeightMapReady.connect(self.renderQueue.deferred('weightMap', weightMapWidget.plotData))
+        calculations.excitonWeightMapClear.connect(self.renderQueue.deferred('weightMap', weightMapWidget.clearData))
+
+        # Exciton DOS widget
+
+        dosWidget = ExcitonDOSWidget()
+
+        calculations.excitonDOSReady.connect(self.renderQueue.deferred('dos', dosWidget.plotData))
+        calculations.excitonDOSClear.connect(self.renderQueue.deferred('dos', dosWidget.clearData))
+
+        # Exciton energy map widget
+
+        energyMapWidget = ExcitonEnergyMapWidget()
+
+        calculations.excitonEnergyMapReady.connect(self.renderQueue.deferred('energyMap', energyMapWidget.plotData))
+        calculations.excitonEnergyMapClear.connect(self.renderQueue.deferred('energyMap', energyMapWidget.clearData))
+
+        energyMapWidget.pointClicked.connect(calculations.selectMapQPoint)
+
+        # Extrema widget
+
+        extremaWidget = ExtremaWidget()
+
+        calculations.excitonExtremaReady.connect(self.renderQueue.deferred('extrema', extremaWidget.setRows))
+
         # Parameters widget
 
         self.parametersWidget = ParametersWidget(options)
         self.parametersWidget.calculateDispersionButton.clicked.connect(calculations.getExcitonDispersion)
         self.parametersWidget.showLabelsButton.clicked.connect(calculations.toggleExcitonLabelsVisibility)
+        self.parametersWidget.trackBandsCheckBox.toggled.connect(calculations.updateBandTracking)
         self.parametersWidget.absorptionParametersChanged.connect(calculations.recomputeAbsorptionSpectra)
+        self.parametersWidget.computeAbsorptionMapButton.clicked.connect(calculations.computeAbsorptionMap)
+        self.parametersWidget.computeDOSButton.clicked.connect(calculations.computeExcitonDOS)
+        self.parametersWidget.computeEnergyMapButton.clicked.connect(calculations.computeExcitonEnergyMap)
+        self.parametersWidget.energyMapParametersChanged.connect(calculations.recomputeExcitonEnergyMap)
+        self.parametersWidget.energyMapBandChanged.connect(calculations.emitExcitonEnergyMap)
+        self.parametersWidget.absorptionParametersChanged.connect(calculations.emitSearchResults)
+        self.parametersWidget.searchQueryChanged.connect(calculations.searchExcitons)
+        calculations.excitonSearchSummary.connect(self.parametersWidget.setSearchSummary)
 
         # Splitters
 
         vSplitter = QSplitter()
         vSplitter.setOrientation(Qt.Orientation.Vertical)
+        lowerTabWidget = QTabWidget()
+        lowerTabWidget.addTab(bandStructureWidget, 'Band Structure')
+        lowerTabWidget.addTab(absorptionMapWidget, 'Absorption Map')
+        lowerTabWidget.addTab(weightMapWidget, 'Weight Map')
+        lowerTabWidget.addTab(dosWidget, 'Exciton DOS')
+        lowerTabWidget.addTab(energyMapWidget, 'Energy Map')
+        lowerTabWidget.addTab(extremaWidget, 'Extrema')
+
         vSplitter.addWidget(dispersionWidget)
-        vSplitter.addWidget(bandStructureWidget)
+        vSplitter.addWidget(lowerTabWidget)
 
         hSplitter = QSplitter()
         hSplitter.setOrientation(Qt.Orientation.Horizontal)
@@ -83,3 +154,10 @@ class GraphsWidget(QWidget):
         vLayout = QVBoxLayout()
         vLayout.addWidget(v2Splitter)
         self.setLayout(vLayout)
+
+        # Performance overlay
+
+        views = {'dispersion': dispersionWidget, 'bandStructure': bandStructureWidget, 'absorption': absorptionWidget, 'absorptionMap': absorptionMapWidget, 'weightMap': weightMapWidget, 'dos': dosWidget, 'energyMap': energyMapWidget}
+
+        self.performanceHUD = PerformanceHUD(self.renderQueue, calculations, views, self)
+        self.parametersWidget.togglePerformanceHUD.connect(self.performanceHUD.setHUDVisible)
@@ -0,0 +1,90 @@
+import numpy as np
+
+
+
+class Same:
+    # Compares by identity, for data that is replaced rather than modified
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Same) and other.value is self.value
+
+
+
+def sameValue(a, b):
+    if a is b:
+        return True
+    elif isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.shape(a) == np.shape(b) and np.array_equal(a, b)
+    elif isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(sameValue(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+
+def penKey(pen):
+    return (pen.color().rgba(), pen.widthF(), pen.style())
+
+
+
+class ItemPool:
+    # Retained graphics items keyed by what they show; unused ones are hidden and reused
+    def __init__(self, container, factory):
+        self.container = container
+        self.factory = factory
+
+        self.items = {}
+        self.states = {}
+        self.free = []
+        self.touched = set()
+
+    def begin(self):
+        self.touched = set()
+
+    def update(self, key, state, apply):
+        item = self.items.get(key)
+
+        if item is None:
+            if len(self.free) > 0:
+                item = self.free.pop()
+            else:
+                item = self.factory()
+                self.container.addItem(item)
+
+            self.items[key] = item
+            self.states[key] = None
+
+        if self.states[key] is None or not sameValue(self.states[key], state):
+            apply(item)
+            self.states[key] = state
+
+        item.show()
+        self.touched.add(key)
+
+        return item
+
+    def end(self):
+        for key in [key for key in self.items if key not in self.touched]:
+            self.release(key)
+
+    def release(self, key):
+        item = self.items.pop(key)
+        self.states.pop(key)
+
+        item.hide()
+        self.free.append(item)
+
+    def releaseAll(self):
+        for key in list(self.items.keys()):
+            self.release(key)
+
+    def invalidate(self):
+        for key in self.states:
+            self.states[key] = None
+
+    def keyOf(self, item):
+        for key, pooledItem in self.items.items():
+            if pooledItem is item:
+                return key
+        return None
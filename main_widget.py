@@ -1,10 +1,11 @@
-from PySide6.QtWidgets import QWidget, QTabWidget, QVBoxLayout
+from PySide6.QtWidgets import QWidget, QTabWidget, QVBoxLayout, QStatusBar
 from options import Options
 from style import DispersionStyle, AbsorptionStyle, BandStructureStyle
 from calculations import Calculations
 from options_widget import OptionsWidget
 from graphs_widget import GraphsWidget
 from style_widget import StyleDialog
+from memory_widget import MemoryWidget
 
 class MainWidget(QWidget):
     def __init__(self):
@@ -14,6 +15,9 @@ class MainWidget(QWidget):
 
         self.calculations = Calculations(self.options)
 
+        self.options.diagoFilesChanged.connect(self.calculations.updateExcitonDispersion)
+        self.options.qPathChanged.connect(self.calculations.updateQPath)
+
         # Styles
 
         self.dispersionStyle = DispersionStyle()
@@ -51,8 +55,16 @@ class MainWidget(QWidget):
         self.options.setDiagoDir('./test-datafiles/diagos')
         self.options.setQPDir('./test-datafiles/qp')
 
+        # Status bar
+
+        self.memoryWidget = MemoryWidget(self.calculations.memoryBudget)
+
+        self.statusBar = QStatusBar()
+        self.statusBar.addPermanentWidget(self.memoryWidget)
+
         mainVLayout = QVBoxLayout()
         mainVLayout.addWidget(self.tabWidget)
+        mainVLayout.addWidget(self.statusBar)
         self.setLayout(mainVLayout)
 
         # Style dialog
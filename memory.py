@@ -0,0 +1,65 @@
+from PySide6.QtCore import QObject, Signal, Slot
+from cache import byteSize
+
+
+class MemoryBudget(QObject):
+    # Total memory shared by every registered cache, after what pinned data already takes
+    usageChanged = Signal()
+
+    def __init__(self, maxBytes = 1024 * 1024 * 1024, parent = None):
+        QObject.__init__(self, parent)
+
+        self.maxBytes = maxBytes
+
+        self.caches = []
+        self.pinned = {}
+
+        # Credits of evicted entries, new and reused entries are credited above it
+        self.clock = 0.0
+
+    def register(self, cache):
+        cache.budget = self
+        self.caches.append(cache)
+
+    def registerPinned(self, name, sizeFunction):
+        self.pinned[name] = sizeFunction
+
+    def cachedBytes(self):
+        return sum(cache.nbytes for cache in self.caches)
+
+    def pinnedBytes(self):
+        return sum(byteSize(function()) for function in self.pinned.values())
+
+    def nbytes(self):
+        return self.cachedBytes() + self.pinnedBytes()
+
+    def usage(self):
+        usage = [(cache.name, cache.nbytes, len(cache)) for cache in self.caches]
+        usage += [(name, byteSize(function()), None) for name, function in self.pinned.items()]
+        return usage
+
+    @Slot()
+    def setMaxBytes(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.enforce()
+
+    def enforce(self, keep = None):
+        # Evicts the entry with the lowest credit among all caches until everything fits
+        available = self.maxBytes - self.pinnedBytes()
+
+        while self.cachedBytes() > available:
+            lowest = None
+
+            for cache in self.caches:
+                key, credit = cache.lowestCredit(keep[1] if keep is not None and keep[0] is cache else None)
+                if key is not None and (lowest is None or credit < lowest[2]):
+                    lowest = (cache, key, credit)
+
+            if lowest is None:
+                break
+
+            cache, key, credit = lowest
+            self.clock = credit
+            cache.pop(key)
+
+        self.usageChanged.emit()
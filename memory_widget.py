@@ -0,0 +1,45 @@
+from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QSpinBox
+
+
+class MemoryWidget(QWidget):
+    def __init__(self, memoryBudget, parent = None):
+        QWidget.__init__(self, parent)
+
+        self.memoryBudget = memoryBudget
+        self.memoryBudget.usageChanged.connect(self.updateUsage)
+
+        self.usageLabel = QLabel()
+
+        self.budgetSpin = QSpinBox()
+        self.budgetSpin.setPrefix('Memory budget ')
+        self.budgetSpin.setSuffix(' MB')
+        self.budgetSpin.setMinimum(16)
+        self.budgetSpin.setMaximum(1024 * 1024)
+        self.budgetSpin.setSingleStep(64)
+        self.budgetSpin.setValue(self.memoryBudget.maxBytes // (1024 * 1024))
+        self.budgetSpin.valueChanged.connect(self.setBudget)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.usageLabel)
+        layout.addWidget(self.budgetSpin)
+        self.setLayout(layout)
+
+        self.updateUsage()
+
+    @Slot()
+    def setBudget(self, megabytes):
+        self.memoryBudget.setMaxBytes(megabytes * 1024 * 1024)
+
+    @Slot()
+    def updateUsage(self):
+        usage = self.memoryBudget.usage()
+
+        parts = [f'{name} {nbytes / (1024 * 1024):.1f} MB' for name, nbytes, entries in usage]
+        total = sum(nbytes for name, nbytes, entries in usage)
+
+        self.usageLabel.setText(' | '.join(parts) + f'  —  {total / (1024 * 1024):.1f} / {self.memoryBudget.maxBytes / (1024 * 1024):.0f} MB')
+
+        lines = [f'{name}: {nbytes / (1024 * 1024):.2f} MB' + ('' if entries is None else f', {entries} entries') for name, nbytes, entries in usage]
+        self.usageLabel.setToolTip('\n'.join(lines))
@@ -1,8 +1,10 @@
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, Slot, QFileSystemWatcher, QTimer
 from pathlib import PurePath, Path
 from yambopy import ibrav_required_parameters, get_lattice_data, YamboLatticeDB, BrillouinZone
 from glob import glob
 import numpy as np
+import os
+import re
 
 
 
@@ -35,9 +37,28 @@ class Options(QObject):
 
     numQPointsChanged = Signal(int)
 
+    # Diago files written or modified after the directory was set
+    diagoFilesChanged = Signal(list)
+
+    qPathChanged = Signal()
+
     def __init__(self):
         super().__init__()
 
+        # Diago dir watcher
+        self.diagoDir = ''
+        self.diagoFiles = {}
+
+        self.diagoWatcher = QFileSystemWatcher()
+        self.diagoWatcher.directoryChanged.connect(self.scheduleDiagoScan)
+        self.diagoWatcher.fileChanged.connect(self.scheduleDiagoScan)
+
+        # yambo may still be writing the file, so wait until it settles
+        self.diagoScanTimer = QTimer()
+        self.diagoScanTimer.setSingleShot(True)
+        self.diagoScanTimer.setInterval(1000)
+        self.diagoScanTimer.timeout.connect(self.scanDiagoDir)
+
         # ibrav
         self.ibrav = -1
         self.ibravParameters = ibrav_required_parameters()
@@ -54,14 +75,39 @@ class Options(QObject):
         # Q-Path (yet undefined)
         self.qBZ = None
 
+        # Maximum number of adaptively refined path points, 0 keeps the uniform sampling of qBZ
+        self.samplingBudget = 0
+
         # Dispersion
         self.nExcitons = 6
 
+        # Q-points are drawn as they are read only when asked for in the parameters panel
+        self.streamDispersion = False
+
+        # Curves follow one exciton character through crossings instead of the energy order
+        self.trackBands = False
+
+        # q-points per reciprocal lattice vector of the grid the exciton DOS is evaluated on
+        self.dosGridSize = 60
+
+        # Plane of the exciton energy map, band shown (from 1) and final pixels per side
+        self.energyMapPlane = 'b1-b2'
+        self.energyMapBand = 1
+        self.energyMapSize = 256
+
+        # float32 energies, spectra and weights instead of float64
+        self.singlePrecision = False
+
         # Absorption
         self.energyStep = 0.02
         self.energyMin = 4.0
         self.energyMax = 20.0
 
+        # Broadening, 'yambopy' uses get_chi and the rest the native engine
+        self.broadeningProfile = 'yambopy'
+        self.broadening = 0.1
+        self.broadeningCutoff = 8.0
+
         # Excitons
         self.excMinIntensity = 0.1
 
@@ -84,11 +130,71 @@ class Options(QObject):
             self.diagoDir = dir
             self.parentDir = Path(dir).parent.absolute()
             self.jobString = PurePath(self.diagoDir).name
+            self.watchDiagoDir(dir)
             self.diagoDirChanged.emit(dir, "ndb.BS_diago_Q* found - (" + str(self.nQpoints) + " Q-Points)")
             self.numQPointsChanged.emit(self.nQpoints)
         else:
             self.diagoDirChanged.emit(dir, "ndb.BS_diago_Q* not found!")
 
+    def diagoFileStates(self, dir):
+        states = {}
+
+        for file in glob(dir + '/ndb.BS_diago_Q*'):
+            match = re.search(r'ndb\.BS_diago_Q(\d+)$', file)
+            if match is None:
+                continue
+
+            try:
+                stat = os.stat(file)
+            except OSError:
+                continue
+
+            states[file] = (int(match.group(1)) - 1, stat.st_mtime_ns, stat.st_size)
+
+        return states
+
+    def watchDiagoDir(self, dir):
+        watchedPaths = self.diagoWatcher.directories() + self.diagoWatcher.files()
+        if len(watchedPaths) > 0:
+            self.diagoWatcher.removePaths(watchedPaths)
+
+        self.diagoFiles = self.diagoFileStates(dir)
+
+        self.diagoWatcher.addPath(dir)
+        if len(self.diagoFiles) > 0:
+            self.diagoWatcher.addPaths(list(self.diagoFiles.keys()))
+
+    @Slot()
+    def scheduleDiagoScan(self, path):
+        self.diagoScanTimer.start()
+
+    @Slot()
+    def scanDiagoDir(self):
+        if self.diagoDir == '':
+            return
+
+        states = self.diagoFileStates(self.diagoDir)
+
+        changedQIndices = []
+        for file, state in states.items():
+            if self.diagoFiles.get(file) != state:
+                changedQIndices.append(state[0])
+                if file not in self.diagoFiles:
+                    self.diagoWatcher.addPath(file)
+
+        self.diagoFiles = states
+
+        if len(states) != self.nQpoints:
+            self.nQpoints = len(states)
+            self.diagoDirChanged.emit(self.diagoDir, "ndb.BS_diago_Q* found - (" + str(self.nQpoints) + " Q-Points)")
+            self.numQPointsChanged.emit(self.nQpoints)
+
+        if len(changedQIndices) > 0:
+            self.diagoFilesChanged.emit(sorted(changedQIndices))
+
+    def diagoQIndices(self):
+        return sorted(state[0] for state in self.diagoFiles.values())
+
     def setQPDir(self, dir):
         file = Path(dir + '/ndb.QP')
         if file.is_file():
@@ -123,6 +229,10 @@ class Options(QObject):
 
     def setBrillouinZone(self, path: str = None, npoints: int = None, density: float = None):
         self.qBZ = BrillouinZone(ibrav=self.ibrav, parameters=self.latticeParameters, path_string=path, npoints=npoints, density=density)
+        self.qPathChanged.emit()
+
+    def setSamplingBudget(self, budget):
+        self.samplingBudget = budget
 
     def getPathString(self):
         return self.qBZ.path_string
@@ -156,6 +266,30 @@ class Options(QObject):
         if n < 1: n = 1
         self.nExcitons = n
 
+    def setDOSGridSize(self, size):
+        if size < 1: size = 1
+        self.dosGridSize = size
+
+    def setEnergyMapPlane(self, plane):
+        self.energyMapPlane = plane
+
+    def setEnergyMapBand(self, band):
+        if band < 1: band = 1
+        self.energyMapBand = band
+
+    def setEnergyMapSize(self, size):
+        if size < 2: size = 2
+        self.energyMapSize = size
+
+    def setTrackBands(self, track):
+        self.trackBands = track
+
+    def setStreamDispersion(self, stream):
+        self.streamDispersion = stream
+
+    def setSinglePrecision(self, single):
+        self.singlePrecision = single
+
     def setEnergyStep(self, step):
         if step <= 0.0: step = 0.001
         elif step > self.energyMax - self.energyMin: step = self.energyMax - self.energyMin
@@ -171,6 +305,13 @@ class Options(QObject):
         if self.energyMin + self.energyStep > energy: energy = self.energyMin + self.energyStep
         self.energyMax = energy
 
+    def setBroadeningProfile(self, profile):
+        self.broadeningProfile = profile
+
+    def setBroadening(self, broadening):
+        if broadening <= 0.0: broadening = 0.001
+        self.broadening = broadening
+
     def setExcMinIntensity(self, intensity):
         if intensity < 0.0: intensity = 0.0
         if intensity > 1.0: intensity = 1.0
@@ -157,12 +157,22 @@ class OptionsWidget(QWidget):
 
         self.interpolationComboBox = QComboBox()
         self.interpolationComboBox.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
-        self.interpolationComboBox.addItems(['Number of points', 'Density'])
+        self.interpolationComboBox.addItems(['Number of points', 'Density', 'Adaptive'])
+
+        # Adaptive sampling refines the uniform path where the interpolated curves bend, up to this many points
+        self.budgetSpin = QSpinBox()
+        self.budgetSpin.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+        self.budgetSpin.setPrefix('Budget ')
+        self.budgetSpin.setMinimum(2)
+        self.budgetSpin.setMaximum(999999)
+        self.budgetSpin.setValue(1000)
+        self.budgetSpin.setVisible(False)
 
         self.interpolationLayout = QHBoxLayout()
         self.interpolationLayout.addWidget(self.interpolationComboBox)
         self.interpolationLayout.addWidget(self.numPointsSpin)
         self.interpolationLayout.addWidget(self.densitySpin)
+        self.interpolationLayout.addWidget(self.budgetSpin)
         self.interpolationComboBox.currentIndexChanged.connect(self.updateInterpolationEdit)
         qPathLayout.addLayout(self.interpolationLayout, 0, 5)
 
@@ -298,17 +308,28 @@ class OptionsWidget(QWidget):
         if index == 0:
             self.numPointsSpin.setVisible(True)
             self.densitySpin.setVisible(False)
+            self.budgetSpin.setVisible(False)
         elif index == 1:
             self.numPointsSpin.setVisible(False)
             self.densitySpin.setVisible(True)
+            self.budgetSpin.setVisible(False)
+        elif index == 2:
+            self.numPointsSpin.setVisible(True)
+            self.densitySpin.setVisible(False)
+            self.budgetSpin.setVisible(True)
 
     @Slot()
     def setBrillouinZone(self):
         try:
             if self.interpolationComboBox.currentIndex() == 0:
+                self.options.setSamplingBudget(0)
                 self.options.setBrillouinZone(path=self.qPathLineEdit.text(), npoints=self.numPointsSpin.value())
             elif self.interpolationComboBox.currentIndex() == 1:
+                self.options.setSamplingBudget(0)
                 self.options.setBrillouinZone(path=self.qPathLineEdit.text(), density=self.densitySpin.value())
+            elif self.interpolationComboBox.currentIndex() == 2:
+                self.options.setSamplingBudget(self.budgetSpin.value())
+                self.options.setBrillouinZone(path=self.qPathLineEdit.text(), npoints=self.numPointsSpin.value())
         except ValueError as error:
             msgBox = QMessageBox()
             msgBox.setText('Error')
@@ -1,12 +1,18 @@
 from PySide6.QtCore import Signal, Slot, Qt
 from PySide6.QtGui import QDoubleValidator, QIntValidator
-from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QGroupBox, QGridLayout, QSizePolicy
+from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QCheckBox, QComboBox, QVBoxLayout, QGroupBox, QGridLayout, QSizePolicy
+from spectra import BROADENING_PROFILES
+from energy_map import MAP_PLANES
 
 
 class ParametersWidget(QWidget):
     weightFactorChanged = Signal(float)
     absorptionParametersChanged = Signal()
     toggleStyleDialog = Signal(bool)
+    togglePerformanceHUD = Signal(bool)
+    energyMapParametersChanged = Signal()
+    energyMapBandChanged = Signal()
+    searchQueryChanged = Signal(str)
 
     def __init__(self, options):
         QWidget.__init__(self)
@@ -24,13 +30,42 @@ class ParametersWidget(QWidget):
         self.nExcitonsLineEdit.editingFinished.connect(self.updateNExcitons)
         self.nExcitonsLineEdit.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
 
+        self.streamDispersionCheckBox = QCheckBox("Show Q-Points While Loading")
+        self.streamDispersionCheckBox.setChecked(self.options.streamDispersion)
+        self.streamDispersionCheckBox.toggled.connect(self.options.setStreamDispersion)
+
+        self.trackBandsCheckBox = QCheckBox("Track Bands by Exciton Character")
+        self.trackBandsCheckBox.setChecked(self.options.trackBands)
+        self.trackBandsCheckBox.toggled.connect(self.options.setTrackBands)
+
+        self.singlePrecisionCheckBox = QCheckBox("Single Precision")
+        self.singlePrecisionCheckBox.setChecked(self.options.singlePrecision)
+        self.singlePrecisionCheckBox.toggled.connect(self.options.setSinglePrecision)
+
         self.calculateDispersionButton = QPushButton("Compute Dispersion")
         self.calculateDispersionButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
 
+        dosGridSizeLabel = QLabel("DOS Grid Size")
+
+        self.dosGridSizeLineEdit = QLineEdit()
+        self.dosGridSizeLineEdit.setValidator(QIntValidator())
+        self.dosGridSizeLineEdit.setText(str(self.options.dosGridSize))
+        self.dosGridSizeLineEdit.editingFinished.connect(self.updateDOSGridSize)
+        self.dosGridSizeLineEdit.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        self.computeDOSButton = QPushButton("Compute DOS")
+        self.computeDOSButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
         dispersionLayout = QGridLayout()
         dispersionLayout.addWidget(nExcitonsLabel, 0, 0)
         dispersionLayout.addWidget(self.nExcitonsLineEdit, 0, 1)
-        dispersionLayout.addWidget(self.calculateDispersionButton, 1, 0, 1, 2)
+        dispersionLayout.addWidget(self.streamDispersionCheckBox, 1, 0, 1, 2)
+        dispersionLayout.addWidget(self.singlePrecisionCheckBox, 2, 0, 1, 2)
+        dispersionLayout.addWidget(self.trackBandsCheckBox, 3, 0, 1, 2)
+        dispersionLayout.addWidget(self.calculateDispersionButton, 4, 0, 1, 2)
+        dispersionLayout.addWidget(dosGridSizeLabel, 5, 0)
+        dispersionLayout.addWidget(self.dosGridSizeLineEdit, 5, 1)
+        dispersionLayout.addWidget(self.computeDOSButton, 6, 0, 1, 2)
 
         dispersionGroupBox = QGroupBox("Excitonic Dispersion")
         dispersionGroupBox.setLayout(dispersionLayout)
@@ -59,6 +94,24 @@ class ParametersWidget(QWidget):
         self.energyStepLineEdit.editingFinished.connect(self.updateEnergyStep)
         self.energyStepLineEdit.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
 
+        broadeningProfileLabel = QLabel("Broadening")
+        broadeningLabel = QLabel("Broadening Width (eV)")
+
+        self.broadeningProfileComboBox = QComboBox()
+        self.broadeningProfileComboBox.addItems(['yambopy'] + BROADENING_PROFILES)
+        self.broadeningProfileComboBox.setCurrentText(self.options.broadeningProfile)
+        self.broadeningProfileComboBox.currentTextChanged.connect(self.updateBroadeningProfile)
+        self.broadeningProfileComboBox.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        self.broadeningLineEdit = QLineEdit()
+        self.broadeningLineEdit.setValidator(QDoubleValidator())
+        self.broadeningLineEdit.setText(f"{self.options.broadening}")
+        self.broadeningLineEdit.editingFinished.connect(self.updateBroadening)
+        self.broadeningLineEdit.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        self.computeAbsorptionMapButton = QPushButton("Compute Absorption Map")
+        self.computeAbsorptionMapButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
         absorptionGridLayout = QGridLayout()
         absorptionGridLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
         absorptionGridLayout.addWidget(energyMinLabel, 0, 0)
@@ -67,6 +120,11 @@ class ParametersWidget(QWidget):
         absorptionGridLayout.addWidget(self.energyMinLineEdit, 0, 1)
         absorptionGridLayout.addWidget(self.energyMaxLineEdit, 1, 1)
         absorptionGridLayout.addWidget(self.energyStepLineEdit, 2, 1)
+        absorptionGridLayout.addWidget(broadeningProfileLabel, 3, 0)
+        absorptionGridLayout.addWidget(broadeningLabel, 4, 0)
+        absorptionGridLayout.addWidget(self.broadeningProfileComboBox, 3, 1)
+        absorptionGridLayout.addWidget(self.broadeningLineEdit, 4, 1)
+        absorptionGridLayout.addWidget(self.computeAbsorptionMapButton, 5, 0, 1, 2)
 
         absorptionGroupBox = QGroupBox("Excitonic Absorption")
         absorptionGroupBox.setLayout(absorptionGridLayout)
@@ -86,15 +144,66 @@ class ParametersWidget(QWidget):
         self.showLabelsButton.setChecked(False)
         self.showLabelsButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
 
+        # Filtered as it is typed, over every exciton of every Q-point read
+        self.searchLineEdit = QLineEdit()
+        self.searchLineEdit.setPlaceholderText("Search: 3.1-3.4 bright, q=5, lowest 3")
+        self.searchLineEdit.setClearButtonEnabled(True)
+        self.searchLineEdit.textChanged.connect(self.searchQueryChanged)
+
+        self.searchSummaryLabel = QLabel()
+        self.searchSummaryLabel.setWordWrap(True)
+
         excitonsGridLayout = QGridLayout()
         excitonsGridLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
         excitonsGridLayout.addWidget(excMinIntensityLabel, 0, 0)
         excitonsGridLayout.addWidget(self.excMinIntensityLineEdit, 0, 1)
         excitonsGridLayout.addWidget(self.showLabelsButton, 2, 0, 1, 2)
+        excitonsGridLayout.addWidget(self.searchLineEdit, 3, 0, 1, 2)
+        excitonsGridLayout.addWidget(self.searchSummaryLabel, 4, 0, 1, 2)
 
         excitonsGroupBox = QGroupBox("Excitons")
         excitonsGroupBox.setLayout(excitonsGridLayout)
 
+        # Energy map widgets
+
+        energyMapPlaneLabel = QLabel("Plane")
+        energyMapBandLabel = QLabel("Exciton Band")
+        energyMapSizeLabel = QLabel("Grid Size")
+
+        self.energyMapPlaneComboBox = QComboBox()
+        self.energyMapPlaneComboBox.addItems(list(MAP_PLANES.keys()))
+        self.energyMapPlaneComboBox.setCurrentText(self.options.energyMapPlane)
+        self.energyMapPlaneComboBox.currentTextChanged.connect(self.updateEnergyMapPlane)
+        self.energyMapPlaneComboBox.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        self.energyMapBandLineEdit = QLineEdit()
+        self.energyMapBandLineEdit.setValidator(QIntValidator())
+        self.energyMapBandLineEdit.setText(str(self.options.energyMapBand))
+        self.energyMapBandLineEdit.editingFinished.connect(self.updateEnergyMapBand)
+        self.energyMapBandLineEdit.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        self.energyMapSizeLineEdit = QLineEdit()
+        self.energyMapSizeLineEdit.setValidator(QIntValidator())
+        self.energyMapSizeLineEdit.setText(str(self.options.energyMapSize))
+        self.energyMapSizeLineEdit.editingFinished.connect(self.updateEnergyMapSize)
+        self.energyMapSizeLineEdit.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        self.computeEnergyMapButton = QPushButton("Compute Energy Map")
+        self.computeEnergyMapButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
+        energyMapGridLayout = QGridLayout()
+        energyMapGridLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        energyMapGridLayout.addWidget(energyMapPlaneLabel, 0, 0)
+        energyMapGridLayout.addWidget(energyMapBandLabel, 1, 0)
+        energyMapGridLayout.addWidget(energyMapSizeLabel, 2, 0)
+        energyMapGridLayout.addWidget(self.energyMapPlaneComboBox, 0, 1)
+        energyMapGridLayout.addWidget(self.energyMapBandLineEdit, 1, 1)
+        energyMapGridLayout.addWidget(self.energyMapSizeLineEdit, 2, 1)
+        energyMapGridLayout.addWidget(self.computeEnergyMapButton, 3, 0, 1, 2)
+
+        energyMapGroupBox = QGroupBox("Exciton Energy Map")
+        energyMapGroupBox.setLayout(energyMapGridLayout)
+
         # Style dialog widgets
 
         toggleDialogButton = QPushButton("Show Style Dialog")
@@ -102,9 +211,15 @@ class ParametersWidget(QWidget):
         toggleDialogButton.clicked.connect(self.toggleStyleDialog)
         toggleDialogButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
 
+        toggleHUDButton = QPushButton("Show Performance HUD")
+        toggleHUDButton.setCheckable(True)
+        toggleHUDButton.clicked.connect(self.togglePerformanceHUD)
+        toggleHUDButton.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+
         styleLayout = QVBoxLayout()
         styleLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
         styleLayout.addWidget(toggleDialogButton)
+        styleLayout.addWidget(toggleHUDButton)
 
         styleGroupBox = QGroupBox("Style")
         styleGroupBox.setLayout(styleLayout)
@@ -116,7 +231,8 @@ class ParametersWidget(QWidget):
         mainLayout.addWidget(dispersionGroupBox, 2, 0)
         mainLayout.addWidget(absorptionGroupBox, 2, 1)
         mainLayout.addWidget(excitonsGroupBox, 2, 2)
-        mainLayout.addWidget(styleGroupBox, 2, 3)
+        mainLayout.addWidget(energyMapGroupBox, 2, 3)
+        mainLayout.addWidget(styleGroupBox, 2, 4)
 
         self.setLayout(mainLayout)
 
@@ -125,6 +241,28 @@ class ParametersWidget(QWidget):
         self.options.setNExcitons(int(self.nExcitonsLineEdit.text()))
         self.nExcitonsLineEdit.setText(str(self.options.nExcitons))
 
+    @Slot()
+    def updateDOSGridSize(self):
+        self.options.setDOSGridSize(int(self.dosGridSizeLineEdit.text()))
+        self.dosGridSizeLineEdit.setText(str(self.options.dosGridSize))
+
+    @Slot()
+    def updateEnergyMapPlane(self, plane):
+        self.options.setEnergyMapPlane(plane)
+        self.energyMapParametersChanged.emit()
+
+    @Slot()
+    def updateEnergyMapBand(self):
+        self.options.setEnergyMapBand(int(self.energyMapBandLineEdit.text()))
+        self.energyMapBandLineEdit.setText(str(self.options.energyMapBand))
+        self.energyMapBandChanged.emit()
+
+    @Slot()
+    def updateEnergyMapSize(self):
+        self.options.setEnergyMapSize(int(self.energyMapSizeLineEdit.text()))
+        self.energyMapSizeLineEdit.setText(str(self.options.energyMapSize))
+        self.energyMapParametersChanged.emit()
+
     @Slot()
     def updateEnergyMin(self):
         self.options.setEnergyMin(float(self.energyMinLineEdit.text()))
@@ -143,6 +281,21 @@ class ParametersWidget(QWidget):
         self.energyStepLineEdit.setText(f"{self.options.energyStep}")
         self.absorptionParametersChanged.emit()
 
+    @Slot()
+    def updateBroadeningProfile(self, profile):
+        self.options.setBroadeningProfile(profile)
+        self.absorptionParametersChanged.emit()
+
+    @Slot()
+    def updateBroadening(self):
+        self.options.setBroadening(float(self.broadeningLineEdit.text()))
+        self.broadeningLineEdit.setText(f"{self.options.broadening}")
+        self.absorptionParametersChanged.emit()
+
+    @Slot()
+    def setSearchSummary(self, summary):
+        self.searchSummaryLabel.setText(summary)
+
     @Slot()
     def updateExcMinIntensity(self):
         self.options.setExcMinIntensity(float(self.excMinIntensityLineEdit.text()))
@@ -0,0 +1,86 @@
+import numpy as np
+
+
+
+def gapSigns(energies, threshold):
+    # Sign of the gap between consecutive bands, zero for bands degenerate within threshold
+    gaps = np.diff(energies, axis = 1)
+    return np.where(np.abs(gaps) < threshold, 0, np.sign(gaps))
+
+
+
+def intervalErrors(x, energies, midEnergies, minLength, degeneracy = 1.0e-6):
+    # Deviation of the midpoint from the straight line drawn between both ends, relative to the energy span
+    linear = (energies[:-1] + energies[1:]) / 2
+    span = max(np.ptp(energies), 1.0e-12)
+    errors = np.max(np.abs(midEnergies - linear), axis = 1) / span
+
+    # Bands swapping order inside an interval need the crossing resolved; degenerate or touching bands do not swap
+    if energies.shape[1] > 1:
+        gaps = gapSigns(energies, degeneracy * span)
+        midGaps = gapSigns(midEnergies, degeneracy * span)
+        signs = np.stack((gaps[:-1], midGaps, gaps[1:]))
+        crossing = np.any(np.any(signs > 0, axis = 0) & np.any(signs < 0, axis = 0), axis = 1)
+        errors[crossing] = np.inf
+
+    # Jumps between disconnected sections and intervals already too short are left alone
+    errors[np.diff(x) <= minLength] = -np.inf
+
+    return errors
+
+
+
+def pathKPoints(kpoints, distances, x):
+    # Points of a piecewise straight path at the given distances, past a jump at the jump distance itself
+    i = np.clip(np.searchsorted(distances, x, side = 'right') - 1, 0, len(distances) - 2)
+
+    steps = distances[i + 1] - distances[i]
+    t = np.where(steps > 0, (x - distances[i]) / np.where(steps > 0, steps, 1.0), 0.0)
+
+    return kpoints[i] + t[:, np.newaxis] * (kpoints[i + 1] - kpoints[i])
+
+
+
+def refinePath(evaluate, kpoints, distances, budget, tolerance = 1.0e-3):
+    # Bisects the intervals of a coarse path where evaluate(kpoints) bends the most, until tolerance or budget is reached
+    k = np.asarray(kpoints, dtype = np.float64)
+    x = np.asarray(distances, dtype = np.float64)
+    energies = np.asarray(evaluate(k))
+
+    if len(x) < 2:
+        return x, energies
+
+    minLength = (x[-1] - x[0]) * 1.0e-6
+
+    midK = (k[:-1] + k[1:]) / 2
+    midX = (x[:-1] + x[1:]) / 2
+    midEnergies = np.asarray(evaluate(midK))
+    errors = intervalErrors(x, energies, midEnergies, minLength)
+
+    while len(x) < budget:
+        order = np.argsort(-errors, kind = 'stable')[:budget - len(x)]
+        chosen = np.sort(order[errors[order] > tolerance])
+
+        if len(chosen) == 0:
+            break
+
+        # Midpoints of the chosen intervals are already evaluated
+        k = np.insert(k, chosen + 1, midK[chosen], axis = 0)
+        x = np.insert(x, chosen + 1, midX[chosen])
+        energies = np.insert(energies, chosen + 1, midEnergies[chosen], axis = 0)
+
+        # Each chosen interval becomes two new ones, whose midpoints are evaluated in one call
+        left = chosen + np.arange(len(chosen))
+        split = np.sort(np.concatenate((left, left + 1)))
+
+        midK = np.insert(midK, chosen + 1, midK[chosen], axis = 0)
+        midX = np.insert(midX, chosen + 1, midX[chosen])
+        midEnergies = np.insert(midEnergies, chosen + 1, midEnergies[chosen], axis = 0)
+
+        midK[split] = (k[split] + k[split + 1]) / 2
+        midX[split] = (x[split] + x[split + 1]) / 2
+        midEnergies[split] = evaluate(midK[split])
+
+        errors = intervalErrors(x, energies, midEnergies, minLength)
+
+    return x, energies
@@ -0,0 +1,96 @@
+from PySide6.QtCore import QObject, QEvent, QTimer, Qt, Slot
+from PySide6.QtWidgets import QLabel
+from collections import deque
+from time import perf_counter
+import pyqtgraph as pg
+
+
+class FrameCounter(QObject):
+    # Paint events of a graphics view over the last second
+    def __init__(self, view):
+        QObject.__init__(self, view)
+
+        self.frames = deque()
+        view.viewport().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            self.frames.append(perf_counter())
+        return False
+
+    def fps(self):
+        now = perf_counter()
+        while len(self.frames) > 0 and now - self.frames[0] > 1.0:
+            self.frames.popleft()
+        return len(self.frames)
+
+
+def pointsDrawn(view):
+    points = 0
+
+    for item in view.scene().items():
+        if not item.isVisible():
+            continue
+
+        if isinstance(item, pg.PlotCurveItem) and item.xData is not None:
+            points += len(item.xData)
+        elif isinstance(item, pg.ScatterPlotItem):
+            points += len(item.data)
+        elif isinstance(item, pg.ImageItem) and item.image is not None:
+            points += item.image.size
+
+    return points
+
+
+class PerformanceHUD(QLabel):
+    def __init__(self, renderQueue, calculations, views, parent = None):
+        QLabel.__init__(self, parent)
+
+        self.renderQueue = renderQueue
+        self.calculations = calculations
+
+        # Graphics views by render queue key
+        self.views = views
+        self.frameCounters = {key: FrameCounter(view) for key, view in views.items()}
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet('QLabel { background-color: rgba(0, 0, 0, 170); color: white; font-family: monospace; padding: 6px; }')
+        self.move(12, 12)
+        self.hide()
+
+        self.refreshTimer = QTimer()
+        self.refreshTimer.setInterval(500)
+        self.refreshTimer.timeout.connect(self.refresh)
+
+    @Slot()
+    def setHUDVisible(self, visible):
+        self.setVisible(visible)
+
+        if visible:
+            self.refresh()
+            self.refreshTimer.start()
+        else:
+            self.refreshTimer.stop()
+
+    @Slot()
+    def refresh(self):
+        lines = []
+
+        for key, view in self.views.items():
+            duration = self.renderQueue.durations.get(key)
+            replot = '-' if duration is None else f'{duration * 1000:.1f} ms'
+
+            lines.append(f'{key:<14} replot {replot:>9}  items {len(view.scene().items()):>5}  points {pointsDrawn(view):>8}  {self.frameCounters[key].fps():>3} fps  ({self.renderQueue.replots[key]} replots)')
+
+        name, seconds = self.calculations.lastOperation
+        if name != '':
+            lines.append(f'Last operation: {name} {seconds * 1000:.1f} ms')
+
+        for cache in self.calculations.memoryBudget.caches:
+            lookups = cache.hits + cache.misses
+            hitRate = '-' if lookups == 0 else f'{100.0 * cache.hits / lookups:.0f}%'
+            lines.append(f'{cache.name}: hit rate {hitRate} ({cache.hits}/{lookups})')
+
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        self.raise_()
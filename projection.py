@@ -0,0 +1,108 @@
+from scipy.spatial import cKDTree
+import numpy as np
+
+
+
+def expandBySymmetry(carPoints, symCar, timeReversal = True):
+    # Star of every point, with the index of the point it comes from
+    carPoints = np.asarray(carPoints, dtype = np.float64).reshape(-1, 3)
+
+    expanded = np.einsum('sij,qj->qsi', np.asarray(symCar, dtype = np.float64), carPoints)
+    if timeReversal:
+        expanded = np.concatenate((expanded, -expanded), axis = 1)
+
+    owners = np.repeat(np.arange(len(carPoints)), expanded.shape[1])
+
+    return expanded.reshape(-1, 3), owners
+
+
+
+def zoneImages(points, owners, rlat, tolerance = 1e-5):
+    # Points shifted by reciprocal lattice vectors into the first Brillouin zone, which lies within half the summed lengths of rlat from Gamma
+    rlat = np.asarray(rlat, dtype = np.float64)
+    shifts = np.array([i * rlat[0] + j * rlat[1] + k * rlat[2] for i in (0, -1, 1) for j in (0, -1, 1) for k in (0, -1, 1)])
+
+    radius = 0.5 * np.sum(np.linalg.norm(rlat, axis = 1))
+
+    shifted = (points[np.newaxis, :, :] + shifts[:, np.newaxis, :]).reshape(-1, 3)
+    shiftedOwners = np.tile(owners, len(shifts))
+
+    # Unshifted images are kept too, for paths reaching outside the first zone
+    keep = (np.arange(len(shifted)) < len(points)) | (np.linalg.norm(shifted, axis = 1) <= radius * (1.0 + tolerance))
+
+    return shifted[keep], shiftedOwners[keep]
+
+
+
+class CollinearProjector:
+    # Symmetry-expanded Q-points indexed once, then projected onto any path made of straight segments
+    def __init__(self, symCar, rlat = None, timeReversal = True, tolerance = 1e-5):
+        self.symCar = np.asarray(symCar, dtype = np.float64)
+        self.rlat = rlat
+        self.timeReversal = timeReversal
+        self.tolerance = tolerance
+
+        self.points = np.zeros((0, 3))
+        self.owners = np.zeros(0, dtype = int)
+        self.tree = None
+
+    def setPoints(self, carPoints):
+        self.points, self.owners = expandBySymmetry(carPoints, self.symCar, self.timeReversal)
+
+        # Q-points stored outside the first zone reach the path through their periodic images
+        if self.rlat is not None:
+            self.points, self.owners = zoneImages(self.points, self.owners, self.rlat, self.tolerance)
+
+        self.tree = cKDTree(self.points) if len(self.points) > 0 else None
+
+    def project(self, pathPoints, pathDistances):
+        pathPoints = np.asarray(pathPoints, dtype = np.float64)
+        pathDistances = np.asarray(pathDistances, dtype = np.float64)
+
+        if self.tree is None or len(pathPoints) < 2:
+            return np.zeros((0, 3)), np.zeros(0, dtype = int), np.zeros(0)
+
+        starts = pathPoints[:-1]
+        directions = pathPoints[1:] - pathPoints[:-1]
+        lengths = np.linalg.norm(directions, axis = 1)
+
+        tolerance = self.tolerance * max(np.max(np.linalg.norm(pathPoints, axis = 1)), 1.0e-12)
+
+        # Jumps between disconnected sections do not advance along the path
+        segments = np.flatnonzero((pathDistances[1:] - pathDistances[:-1] > 0.0) & (lengths > tolerance))
+
+        candidates = self.tree.query_ball_point((starts[segments] + pathPoints[segments + 1]) / 2, lengths[segments] / 2 + tolerance)
+
+        pointIndices = []
+        distances = []
+
+        for s, candidate in zip(segments, candidates):
+            if len(candidate) == 0:
+                continue
+
+            candidate = np.array(candidate)
+            offsets = self.points[candidate] - starts[s]
+
+            t = offsets @ directions[s] / (lengths[s] * lengths[s])
+            normal = np.linalg.norm(offsets - t[:, np.newaxis] * directions[s], axis = 1)
+
+            onSegment = (normal < tolerance) & (t > -tolerance / lengths[s]) & (t < 1.0 + tolerance / lengths[s])
+
+            pointIndices.append(candidate[onSegment])
+            distances.append(pathDistances[s] + np.clip(t[onSegment], 0.0, 1.0) * (pathDistances[s + 1] - pathDistances[s]))
+
+        if len(pointIndices) == 0:
+            return np.zeros((0, 3)), np.zeros(0, dtype = int), np.zeros(0)
+
+        pointIndices = np.concatenate(pointIndices)
+        distances = np.concatenate(distances)
+
+        # A point shared by two consecutive segments, or reached by several symmetry or periodic images, is kept once
+        owners = self.owners[pointIndices]
+        scale = max(pathDistances[-1] - pathDistances[0], 1.0e-12)
+        keys = np.column_stack((owners, np.rint(distances / (self.tolerance * scale)).astype(np.int64)))
+
+        unique, first = np.unique(keys, axis = 0, return_index = True)
+        first = first[np.lexsort((owners[first], distances[first]))]
+
+        return self.points[pointIndices[first]], owners[first], distances[first]
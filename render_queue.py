@@ -0,0 +1,62 @@
+from PySide6.QtCore import QObject, QTimer, Slot
+from collections import Counter, OrderedDict
+from time import perf_counter
+
+
+class RenderQueue(QObject):
+    # Widgets marked dirty are redrawn once, with the latest data, on the next event-loop turn
+    def __init__(self, parent = None):
+        QObject.__init__(self, parent)
+
+        self.dirty = OrderedDict()
+
+        # Number of redraw requests and of actual redraws per widget
+        self.requests = Counter()
+        self.replots = Counter()
+
+        # Duration in seconds of the last redraw per widget
+        self.durations = {}
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, key, function, *args):
+        self.requests[key] += 1
+
+        self.dirty[key] = (function, args)
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def deferred(self, key, function):
+        def slot(*args):
+            self.schedule(key, function, *args)
+        return slot
+
+    @Slot()
+    def flush(self):
+        dirty = self.dirty
+        self.dirty = OrderedDict()
+
+        while dirty:
+            key, (function, args) = dirty.popitem(last = False)
+            self.replots[key] += 1
+
+            start = perf_counter()
+            try:
+                function(*args)
+            except Exception:
+                # The widgets not redrawn yet are on the next turn, unless scheduled again with newer data meanwhile
+                for pendingKey, call in dirty.items():
+                    self.dirty.setdefault(pendingKey, call)
+                if self.dirty and not self.timer.isActive():
+                    self.timer.start()
+                raise
+            finally:
+                self.durations[key] = perf_counter() - start
+
+    def resetCounters(self):
+        self.requests.clear()
+        self.replots.clear()
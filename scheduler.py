@@ -0,0 +1,98 @@
+from PySide6.QtCore import QObject, Signal, Slot
+from collections import Counter
+from time import perf_counter
+from workers import Worker
+
+
+class JobScheduler(QObject):
+    # One job per kind: a newer submission cancels the older one, and only the latest result is delivered
+    jobDone = Signal(str, float)
+
+    def __init__(self, threadPool, parent = None):
+        QObject.__init__(self, parent)
+
+        self.threadPool = threadPool
+
+        self.jobs = {}
+        self.workers = {}
+        self.callbacks = {}
+        self.startTimes = {}
+
+        # Computing time of the last result of each kind
+        self.seconds = {}
+        self.retiredWorkers = []
+
+        # Per kind counts, to check that superseded jobs never reach the widgets
+        self.submitted = Counter()
+        self.cancelled = Counter()
+        self.delivered = Counter()
+
+    def submit(self, kind, function, args, onFinished, onFailed = None, priority = 1):
+        self.cancel(kind)
+
+        job = self.jobs[kind]
+
+        worker = Worker((kind, job), function, *args)
+        worker.signals.finished.connect(self.deliver)
+        worker.signals.failed.connect(self.fail)
+
+        self.workers[kind] = worker
+        self.callbacks[kind] = (onFinished, onFailed)
+        self.submitted[kind] += 1
+        self.startTimes[kind] = perf_counter()
+
+        self.threadPool.start(worker, priority)
+
+        return job
+
+    def cancel(self, kind):
+        self.jobs[kind] = self.jobs.get(kind, 0) + 1
+        self.callbacks.pop(kind, None)
+
+        worker = self.workers.pop(kind, None)
+        if worker is not None:
+            self.cancelled[kind] += 1
+            self.retire(worker)
+
+    def isPending(self, kind):
+        return kind in self.workers
+
+    def retire(self, worker):
+        worker.cancel()
+
+        # Already running workers are kept alive until they return
+        if not self.threadPool.tryTake(worker):
+            self.retiredWorkers.append(worker)
+
+        self.retiredWorkers = [retiredWorker for retiredWorker in self.retiredWorkers if not retiredWorker.done]
+
+    def current(self, key):
+        kind, job = key
+        return job == self.jobs.get(kind) and kind in self.callbacks
+
+    @Slot()
+    def deliver(self, key, result):
+        if not self.current(key):
+            return
+
+        kind = key[0]
+        worker = self.workers.pop(kind, None)
+        onFinished, onFailed = self.callbacks.pop(kind)
+
+        self.seconds[kind] = worker.seconds if worker is not None else 0.0
+        self.delivered[kind] += 1
+        onFinished(result)
+
+        self.jobDone.emit(kind, perf_counter() - self.startTimes[kind])
+
+    @Slot()
+    def fail(self, key, message):
+        if not self.current(key):
+            return
+
+        kind = key[0]
+        self.workers.pop(kind, None)
+        onFinished, onFailed = self.callbacks.pop(kind)
+
+        if onFailed is not None:
+            onFailed(message)
@@ -0,0 +1,138 @@
+from scipy.special import voigt_profile, wofz, dawsn
+import numpy as np
+
+
+
+BROADENING_PROFILES = ['Lorentzian', 'Gaussian', 'Voigt']
+
+
+
+def lorentzian(x, gamma):
+    return gamma / np.pi / (x * x + gamma * gamma)
+
+
+
+def gaussian(x, sigma):
+    return np.exp(-0.5 * (x / sigma) ** 2) / (sigma * np.sqrt(2.0 * np.pi))
+
+
+
+def voigt(x, width):
+    return voigt_profile(x, width, width)
+
+
+
+PROFILE_FUNCTIONS = {'Lorentzian': lorentzian, 'Gaussian': gaussian, 'Voigt': voigt}
+
+
+
+# Imaginary (pi times the profile) and real parts of the resonant Green's function -1 / (x + i gamma) and of its Gaussian and Voigt counterparts
+def lorentzianResponse(x, gamma):
+    denominator = 1.0 / (x * x + gamma * gamma)
+    return gamma * denominator, -x * denominator
+
+
+
+def gaussianResponse(x, sigma):
+    u = x / (sigma * np.sqrt(2.0))
+    return np.pi * gaussian(x, sigma), -np.sqrt(2.0) / sigma * dawsn(u)
+
+
+
+def voigtResponse(x, width):
+    w = wofz((x + 1j * width) / (width * np.sqrt(2.0))) * (np.sqrt(0.5 * np.pi) / width)
+    return w.real, -w.imag
+
+
+
+RESPONSE_FUNCTIONS = {'Lorentzian': lorentzianResponse, 'Gaussian': gaussianResponse, 'Voigt': voigtResponse}
+
+
+
+def binnedMoments(energies, strengths, binWidth, order = 4):
+    # Bins of consecutive sorted energies, with their centers, first index and moments sum(s (E - center)^k), k < order
+    bins = np.floor((energies - energies[0]) / binWidth).astype(np.int64)
+    firsts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+
+    centers = energies[0] + (bins[firsts] + 0.5) * binWidth
+    offsets = energies - np.repeat(centers, np.diff(np.r_[firsts, len(energies)]))
+
+    moments = np.array([np.add.reduceat(strengths * offsets ** k, firsts) for k in range(order)])
+
+    return centers, firsts, moments
+
+
+
+def farResponse(grid, centers, moments, gamma):
+    # Imaginary part of -sum s / (w - E + i gamma) over excitons far from the grid, expanded around the centers of their bins
+    z = grid[:, np.newaxis] - centers[np.newaxis, :] + 1j * gamma
+
+    total = np.zeros(z.shape, dtype = complex)
+    power = 1.0 / z
+    for moment in moments:
+        total -= moment[np.newaxis, :] * power
+        power = power / z
+
+    return total.sum(axis = 1).imag
+
+
+
+def broadenSpectrum(energies, strengths, grid, width, profile = 'Lorentzian', cutoff = 8.0, maxElements = 1 << 22, response = False):
+    # Sum of broadened peaks evaluated on grid, in blocks of at most maxElements (grid points x excitons); with response, the imaginary part of the sum of Green's functions weighted by complex strengths
+    profileFunction = RESPONSE_FUNCTIONS[profile] if response else PROFILE_FUNCTIONS[profile]
+
+    order = np.argsort(energies)
+    energies = np.asarray(energies)[order]
+    strengths = np.asarray(strengths)[order]
+    grid = np.asarray(grid)
+
+    # Voigt combines a Gaussian and a Lorentzian of the same width
+    reach = cutoff * width * (2.0 if profile == 'Voigt' else 1.0)
+
+    spectrum = np.zeros(len(grid), dtype = np.result_type(strengths.real.dtype, grid.dtype))
+
+    gridChunk = min(len(grid), 1024) if len(grid) > 0 else 1
+    excitonChunk = max(1, maxElements // gridChunk)
+
+    # The real part of every response decays as -1 / x, too slowly to be cut: excitons beyond the cutoff enter through the moments of their bins
+    expandFar = response and len(energies) > 0 and np.isfinite(reach)
+    if expandFar:
+        centers, firsts, moments = binnedMoments(energies, strengths, 0.25 * reach)
+        binOf = np.repeat(np.arange(len(firsts)), np.diff(np.r_[firsts, len(energies)]))
+        firsts = np.r_[firsts, len(energies)]
+        gamma = 0.0 if profile == 'Gaussian' else width
+
+    for start in range(0, len(grid), gridChunk):
+        gridBlock = grid[start:start + gridChunk]
+
+        # Only excitons within the cutoff contribute to this block
+        low = np.searchsorted(energies, gridBlock[0] - reach, side = 'left')
+        high = np.searchsorted(energies, gridBlock[-1] + reach, side = 'right')
+
+        if expandFar:
+            # Whole bins are either summed exactly or expanded
+            lowBin = binOf[low] if low < high else np.searchsorted(centers, gridBlock[0])
+            highBin = binOf[high - 1] + 1 if low < high else lowBin
+            low, high = firsts[lowBin], firsts[highBin]
+
+            far = np.r_[0:lowBin, highBin:len(centers)]
+            for binStart in range(0, len(far), excitonChunk):
+                farBins = far[binStart:binStart + excitonChunk]
+                spectrum[start:start + gridChunk] += farResponse(gridBlock, centers[farBins], moments[:, farBins], gamma)
+
+        for excitonStart in range(low, high, excitonChunk):
+            excitonEnd = min(high, excitonStart + excitonChunk)
+
+            x = gridBlock[:, np.newaxis] - energies[np.newaxis, excitonStart:excitonEnd]
+            blockStrengths = strengths[excitonStart:excitonEnd]
+
+            if response:
+                # Im(s G) = Re(s) Im(G) + Im(s) Re(G), exact over the whole bins near the block
+                absorptive, dispersive = profileFunction(x, width)
+                spectrum[start:start + gridChunk] += absorptive @ blockStrengths.real + dispersive @ blockStrengths.imag
+            else:
+                values = profileFunction(x, width)
+                values[np.abs(x) > reach] = 0.0
+                spectrum[start:start + gridChunk] += values @ blockStrengths
+
+    return spectrum
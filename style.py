@@ -416,10 +416,17 @@ class BandStructureStyle(BaseStyle):
 
         self.brush = pg.mkBrush('orange')
 
+        self.weightFactor = 1.0
+
     @Slot()
     def applyDefaultStyle(self):
         self.curveStyle.setCommonPalette()
 
+    @Slot()
+    def setWeightFactor(self, factor):
+        self.weightFactor = factor
+        self.weightFactorChanged.emit(factor)
+
     @Slot()
     def setBrushColor(self, color):
         self.brush = pg.mkBrush(color)
@@ -533,8 +533,8 @@ class FillStyleWidget(QWidget):
         weightFactorSpin = QDoubleSpinBox()
         weightFactorSpin.setMinimum(0.0)
         weightFactorSpin.setMaximum(1000.0)
-        weightFactorSpin.setValue(1.0)
-        weightFactorSpin.valueChanged.connect(self.style.weightFactorChanged)
+        weightFactorSpin.setValue(self.style.weightFactor)
+        weightFactorSpin.valueChanged.connect(self.style.setWeightFactor)
         weightFactorSpin.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
 
         mainLayout = QGridLayout()
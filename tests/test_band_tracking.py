@@ -0,0 +1,106 @@
+from band_tracking import transitionKeys, overlapMatrix, pathSequence, meshPairs, trackPermutations
+import numpy as np
+
+
+
+RLAT = np.eye(3)
+
+
+
+def table(numK = 10):
+    # Rows (k, v, c) of a BSE table with two valence and two conduction bands
+    k, v, c = np.meshgrid(np.arange(1, numK + 1), [1, 2], [3, 4], indexing = 'ij')
+    return np.column_stack((k.ravel(), v.ravel(), c.ravel()))
+
+
+
+def orthonormal(numStates, numTransitions, seed):
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size = (numTransitions, numStates)) + 1j * rng.normal(size = (numTransitions, numStates))
+    return np.linalg.qr(matrix)[0].T
+
+
+
+def test_transition_keys_are_unique():
+    rows = table()
+    keys = transitionKeys(rows, rows.max(axis = 0) + 1)
+    assert len(np.unique(keys)) == len(rows)
+
+
+
+def test_overlaps_follow_shared_transitions():
+    rows = table()
+    vectors = orthonormal(4, len(rows), 0)
+
+    # The same states in another order, with the transitions of the table shuffled
+    shuffle = np.random.default_rng(1).permutation(len(rows))
+    overlaps = overlapMatrix(rows, vectors, rows[shuffle], vectors[[2, 0, 3, 1]][:, shuffle])
+
+    expected = np.zeros((4, 4))
+    expected[[2, 0, 3, 1], np.arange(4)] = 1.0
+    assert np.allclose(overlaps, expected)
+
+
+
+def test_overlaps_in_chunks():
+    rows = table(50)
+    vectors1 = orthonormal(3, len(rows), 2)
+    vectors2 = orthonormal(3, len(rows), 3)
+
+    assert np.allclose(overlapMatrix(rows, vectors1, rows, vectors2, chunk = 7), overlapMatrix(rows, vectors1, rows, vectors2))
+
+
+
+def test_path_sequence():
+    assert list(pathSequence([0, 0, 1, 2, 2, 1, 0])) == [0, 1, 2, 1, 0]
+    assert len(pathSequence([])) == 0
+
+
+
+def test_mesh_pairs_reach_every_q_point_once():
+    rng = np.random.default_rng(4)
+    qIndices = np.arange(12)
+    points = rng.uniform(0.0, 0.5, (12, 3))
+
+    pairs = meshPairs(5, qIndices, points, RLAT)
+
+    reached = [b for a, b in pairs]
+    assert sorted(reached + [5]) == list(qIndices)
+
+    # Every step starts from a Q-point already reached
+    seen = {5}
+    for a, b in pairs:
+        assert a in seen
+        seen.add(b)
+
+
+
+def test_mesh_pairs_use_periodic_images_only():
+    # Q-point 2 is the inversion image of Q-point 1 close to it, but in a rotated frame; Q-point 1 is reached through Q-point 0 instead
+    points = np.array([[0.0, 0.0, 0.0], [0.3, 0.0, 0.0], [-0.32, 0.0, 0.0], [0.62, 0.0, 0.0]])
+    pairs = meshPairs(0, np.arange(4), points, RLAT)
+
+    assert (0, 1) in pairs
+    assert (0, 2) in pairs
+
+    # Q-point 3 lies next to Q-point 2 across the zone boundary
+    assert (2, 3) in pairs
+
+
+
+def test_track_permutations_follow_states():
+    rows = table()
+    vectors = orthonormal(4, len(rows), 5)
+
+    # Q-point 1 has the states of Q-point 0 sorted differently, Q-point 2 those of Q-point 1 sorted differently again
+    orders = {0: np.arange(4), 1: np.array([1, 0, 3, 2]), 2: np.array([3, 2, 0, 1])}
+    states = {iq: vectors[order] for iq, order in orders.items()}
+
+    pairs = [(0, 1), (1, 2)]
+    overlaps = {(a, b): overlapMatrix(rows, states[a], rows, states[b]) for a, b in pairs}
+
+    permutations = trackPermutations(0, pairs, overlaps, 4)
+
+    # Each curve keeps following the same state
+    for iq, order in orders.items():
+        assert np.array_equal(order[permutations[iq]], np.arange(4))
@@ -0,0 +1,55 @@
+from cache import LRUCache
+from memory import MemoryBudget
+import numpy as np
+
+
+
+def entry(numBytes):
+    return np.zeros(numBytes, dtype = np.uint8)
+
+
+
+def test_cheap_entries_are_evicted_first():
+    budget = MemoryBudget(maxBytes = 3000)
+
+    spectra = LRUCache('spectra', 10000)
+    maps = LRUCache('maps', 10000)
+    budget.register(spectra)
+    budget.register(maps)
+
+    # Expensive spectra are kept over cheap maps of the same size, even older ones
+    spectra.put(0, entry(1000), cost = 2.0)
+    maps.put(0, entry(1000), cost = 0.001)
+    maps.put(1, entry(1000), cost = 0.001)
+    spectra.put(1, entry(1000), cost = 2.0)
+
+    assert 0 in spectra and 1 in spectra
+    assert len(maps) == 1
+
+
+
+def test_size_counts_against_cost():
+    budget = MemoryBudget(maxBytes = 2500)
+
+    cache = LRUCache('cache', 10000)
+    budget.register(cache)
+
+    # Same cost, the large entry frees the most memory
+    cache.put('large', entry(2000), cost = 1.0)
+    cache.put('small', entry(400), cost = 1.0)
+    cache.put('other', entry(400), cost = 1.0)
+
+    assert 'large' not in cache
+    assert 'small' in cache and 'other' in cache
+
+
+
+def test_lru_limit_of_a_cache():
+    cache = LRUCache('cache', 2000)
+
+    cache.put(0, entry(1000))
+    cache.put(1, entry(1000))
+    cache.get(0)
+    cache.put(2, entry(1000))
+
+    assert 0 in cache and 2 in cache and 1 not in cache
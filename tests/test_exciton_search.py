@@ -0,0 +1,60 @@
+from exciton_search import buildIndex, parseQuery, searchIndex
+import numpy as np
+import pytest
+
+
+
+def index():
+    # Q-point 0 is ten times brighter than Q-point 1
+    return buildIndex({
+        0: ([2.0, 1.0, 3.0], [10.0, 5.0, 0.5]),
+        1: ([1.5, 2.5], [1.0, 0.05])
+    })
+
+
+
+def test_index_sorted_by_energy():
+    excitons = index()
+
+    assert excitons['energy'].tolist() == [1.0, 1.5, 2.0, 2.5, 3.0]
+    assert excitons['q'].tolist() == [0, 1, 0, 1, 0]
+    assert excitons['exciton'].tolist() == [2, 1, 1, 2, 3]
+
+
+
+def test_intensities_global_and_per_q():
+    excitons = index()
+
+    assert np.allclose(excitons['intensity'], [0.5, 0.1, 1.0, 0.005, 0.05])
+    assert np.allclose(excitons['qIntensity'], [0.5, 1.0, 1.0, 0.05, 0.05])
+
+
+
+def test_parse_query():
+    query = parseQuery('1.2-2.8, q=2 brightest 2')
+
+    assert (query['energyMin'], query['energyMax']) == (1.2, 2.8)
+    assert query['conditions'] == [('q', '=', 1.0)]
+    assert (query['order'], query['count']) == ('brightest', 2)
+
+    with pytest.raises(ValueError):
+        parseQuery('shiny')
+
+
+
+def test_bright_per_q_point():
+    # The brightest exciton of Q-point 1 is bright in its absorption spectrum, although dim on the global scale
+    excitons = index()
+    matches = searchIndex(excitons, parseQuery('bright'), 0.2)
+
+    assert excitons['energy'][matches].tolist() == [1.0, 1.5, 2.0]
+    assert excitons['energy'][searchIndex(excitons, parseQuery('dark'), 0.2)].tolist() == [2.5, 3.0]
+
+
+
+def test_conditions_and_orders():
+    excitons = index()
+
+    assert excitons['energy'][searchIndex(excitons, parseQuery('i<0.2 brightest'), 0.2)].tolist() == [1.5]
+    assert excitons['energy'][searchIndex(excitons, parseQuery('e>1.5 lowest 2'), 0.2)].tolist() == [2.0, 2.5]
+    assert excitons['energy'][searchIndex(excitons, parseQuery('1-2 darkest'), 0.2)].tolist() == [1.5]
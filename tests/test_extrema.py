@@ -0,0 +1,87 @@
+from exciton_dos import evaluateStars
+from extrema import candidateExtrema, pathExtrema, effectiveMass
+import numpy as np
+
+
+
+CENTER = 0.37
+AMPLITUDE = 0.5
+
+
+
+def cosineBand():
+    # E = 2 - A cos(2 pi (kx - 0.37)), a minimum at kx = 0.37 with curvature 4 pi^2 A
+    phase = np.exp(-2.0j * np.pi * CENTER)
+    coefs = np.array([[2.0, -0.5 * AMPLITUDE * phase, -0.5 * AMPLITUDE * np.conj(phase)]])
+    rpts = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [-1.0, 0.0, 0.0]])
+    return coefs, rpts, np.eye(3)[np.newaxis]
+
+
+
+def extremaAlong(start, stop, x):
+    arrays = cosineBand()
+    pathKPointsRed = np.array([[start, 0.0, 0.0], [stop, 0.0, 0.0]])
+    pathDistances = np.array([0.0, stop - start])
+
+    kpoints = np.column_stack((start + x, np.zeros_like(x), np.zeros_like(x)))
+    energies = evaluateStars(arrays, kpoints).T
+
+    return pathExtrema(x, energies, arrays, pathKPointsRed, pathDistances)
+
+
+
+def test_candidates_within_sections():
+    x = np.array([0.0, 1.0, 2.0, 2.0, 3.0, 4.0])
+    energies = np.array([[1.0, 0.0, 1.0, 1.0, 2.0, 3.0]])
+    minima, maxima = candidateExtrema(x, energies)
+
+    assert minima[0].tolist() == [False, True, False, True, False, False]
+    assert maxima[0].tolist() == [True, False, True, False, False, True]
+
+
+
+def test_interior_minimum():
+    extrema = extremaAlong(0.0, 0.6, np.linspace(0.0, 0.6, 13))
+    minima = [e for e in extrema if e[1]]
+
+    assert len(minima) == 1
+    band, isMinimum, position, energy, curvature = minima[0]
+    assert abs(position - CENTER) < 1e-3
+    assert abs(energy - (2.0 - AMPLITUDE)) < 1e-4
+    assert abs(curvature - 4 * np.pi ** 2 * AMPLITUDE) / (4 * np.pi ** 2 * AMPLITUDE) < 0.03
+
+
+
+def test_sloping_end_has_no_curvature():
+    # The band still falls at the start of the path: its highest point there, but not a stationary one
+    extrema = extremaAlong(0.0, 0.6, np.linspace(0.0, 0.6, 13))
+    maxima = [e for e in extrema if not e[1]]
+
+    assert len(maxima) == 2
+    assert maxima[0][2] == 0.0
+    assert abs(maxima[0][3] - (2.0 - AMPLITUDE * np.cos(2 * np.pi * CENTER))) < 1e-9
+    assert all(np.isnan(e[4]) for e in maxima)
+    assert effectiveMass(maxima[0][4], 1.0, 27.2) is None
+
+
+
+def test_stationary_end_keeps_curvature():
+    x = np.linspace(0.0, 0.43, 11)
+    extrema = extremaAlong(CENTER, CENTER + 0.43, x)
+    minima = [e for e in extrema if e[1]]
+
+    assert len(minima) == 1
+    band, isMinimum, position, energy, curvature = minima[0]
+    assert position == 0.0
+    assert abs(energy - (2.0 - AMPLITUDE)) < 1e-4
+    assert abs(curvature - 4 * np.pi ** 2 * AMPLITUDE) / (4 * np.pi ** 2 * AMPLITUDE) < 0.03
+
+
+
+def test_close_samples_give_one_extremum():
+    # Adaptive sampling leaves gaps much smaller than the window around the minimum
+    x = np.sort(np.r_[np.linspace(0.0, 0.6, 13), CENTER - 1e-6, CENTER + 1e-6, CENTER + 2e-6])
+    minima = [e for e in extremaAlong(0.0, 0.6, x) if e[1]]
+
+    assert len(minima) == 1
+    assert abs(minima[0][2] - CENTER) < 1e-3
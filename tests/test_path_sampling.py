@@ -0,0 +1,75 @@
+from path_sampling import intervalErrors, pathKPoints, refinePath
+import numpy as np
+
+
+
+KPOINTS = np.array([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0], [0.5, 0.5, 0.0]])
+DISTANCES = np.array([0.0, 0.5, 1.0])
+
+
+
+def bands(*functions):
+    # Bands as functions of the reduced coordinates, in a fixed order like tracked bands
+    return lambda k: np.column_stack([f(np.asarray(k)) for f in functions])
+
+
+
+def cosine(k):
+    return np.cos(3.0 * k[:, 0]) + np.sin(2.0 * k[:, 1])
+
+
+
+def test_path_kpoints():
+    kpoints = pathKPoints(KPOINTS, DISTANCES, np.array([0.0, 0.25, 0.5, 0.75, 1.0]))
+    assert np.allclose(kpoints, [[0, 0, 0], [0.25, 0, 0], [0.5, 0, 0], [0.5, 0.25, 0], [0.5, 0.5, 0]])
+
+
+
+def test_smooth_band_is_refined_within_budget():
+    x, energies = refinePath(bands(cosine), KPOINTS, DISTANCES, 1000)
+
+    assert 3 < len(x) < 200
+    assert np.all(np.diff(x) > 0)
+
+    # Every interval left follows the band within the tolerance
+    midK = pathKPoints(KPOINTS, DISTANCES, (x[:-1] + x[1:]) / 2)
+    assert np.max(np.abs(cosine(midK) - (energies[:-1, 0] + energies[1:, 0]) / 2)) / np.ptp(energies) < 1.0e-3
+
+
+
+def test_degenerate_bands_are_not_crossings():
+    clean = len(refinePath(bands(cosine), KPOINTS, DISTANCES, 1000)[0])
+
+    # A copy of the band split only by noise
+    rng = np.random.default_rng(0)
+    noisy = len(refinePath(bands(cosine, lambda k: cosine(k) + 1.0e-9 * rng.normal(size = len(k))), KPOINTS, DISTANCES, 1000)[0])
+    assert noisy <= clean + 2
+
+
+
+def test_touching_bands_are_not_crossings():
+    clean = len(refinePath(bands(cosine), KPOINTS, DISTANCES, 1000)[0])
+
+    # Both bands meet at Gamma and nowhere else
+    touching = len(refinePath(bands(cosine, lambda k: cosine(k) - 0.3 * np.sin(np.pi * np.linalg.norm(k, axis = 1)) ** 2), KPOINTS, DISTANCES, 1000)[0])
+    assert touching <= clean + 4
+
+
+
+def test_crossing_is_resolved():
+    # Two straight bands crossing at k = 0.3 along the first segment
+    x, energies = refinePath(bands(lambda k: k[:, 0], lambda k: 0.3 + 0 * k[:, 0]), KPOINTS, DISTANCES, 200)
+    assert np.min(np.abs(x - 0.3)) < 1.0e-3
+
+
+
+def test_interval_errors_signs():
+    x = np.array([0.0, 1.0])
+    energies = np.array([[0.0, 1.0], [0.0, 1.0]])
+
+    assert intervalErrors(x, energies, np.array([[0.0, 1.0]]), 1.0e-6)[0] == 0.0
+    assert intervalErrors(x, energies, np.array([[1.0, 0.5]]), 1.0e-6)[0] == np.inf
+
+    # A gap of exactly zero at one end is a touch, not a flip
+    touching = np.array([[0.0, 0.0], [0.0, 1.0]])
+    assert np.isfinite(intervalErrors(x, touching, np.array([[0.0, 0.5]]), 1.0e-6)[0])
@@ -0,0 +1,112 @@
+from spectra import broadenSpectrum
+from exciton_dos import evaluateStars
+from exciton_weights import complexArray, complexType, kWeights
+from band_tracking import overlapMatrix
+import numpy as np
+
+
+
+# Single precision results, relative to the largest double precision value
+TOLERANCE = 1.0e-5
+
+
+
+def relativeError(single, double):
+    return np.max(np.abs(np.asarray(single, dtype = np.result_type(single, double)) - double)) / np.max(np.abs(double))
+
+
+
+def excitons(numExcitons = 300, seed = 0):
+    rng = np.random.default_rng(seed)
+    energies = np.sort(rng.uniform(1.0, 6.0, numExcitons))
+    residuals = rng.normal(size = numExcitons) + 1j * rng.normal(size = numExcitons)
+    return energies, residuals
+
+
+
+def test_complex_type():
+    assert complexType(np.float32) == np.complex64
+    assert complexType(np.float64) == np.complex128
+
+
+
+def test_energies():
+    rng = np.random.default_rng(1)
+    arrays = (rng.normal(size = (4, 20)) + 1j * rng.normal(size = (4, 20)), rng.integers(-3, 4, (20, 3)).astype(np.float64), np.array([np.eye(3), -np.eye(3)]))
+    kpoints = rng.uniform(-0.5, 0.5, (50, 3))
+
+    double = evaluateStars(arrays, kpoints)
+    single = evaluateStars((arrays[0].astype(np.complex64), arrays[1].astype(np.float32), arrays[2].astype(np.float32)), kpoints.astype(np.float32))
+
+    assert double.dtype == np.float64
+    assert single.dtype == np.float32
+    assert relativeError(single, double) < TOLERANCE
+
+
+
+def test_complex_array():
+    rng = np.random.default_rng(4)
+    pairs = rng.normal(size = (3, 7, 2)).astype(np.float32)
+
+    for realType in (np.float32, np.float64):
+        array = complexArray(pairs, realType)
+
+        assert array.dtype == complexType(realType)
+        assert np.array_equal(array, pairs[..., 0].astype(np.float64) + 1j * pairs[..., 1])
+
+    # Single precision from single precision pairs is a view, no copy is made
+    assert np.shares_memory(complexArray(pairs, np.float32), pairs)
+
+
+
+def test_broadened_spectra():
+    energies, strengths = excitons()
+    grid = np.arange(0.0, 8.0, 0.01)
+
+    for profile in ('Lorentzian', 'Gaussian', 'Voigt'):
+        for response in (False, True):
+            values = strengths if response else np.abs(strengths)
+
+            double = broadenSpectrum(energies, values, grid, 0.1, profile, response = response)
+            single = broadenSpectrum(energies.astype(np.float32), values.astype(complexType(np.float32) if response else np.float32), grid.astype(np.float32), 0.1, profile, response = response)
+
+            assert single.dtype == np.float32
+            assert relativeError(single, double) < TOLERANCE
+
+
+
+def test_band_weights():
+    rng = np.random.default_rng(2)
+    eigenvectors = rng.normal(size = (6, 400)) + 1j * rng.normal(size = (6, 400))
+    kIndices = rng.integers(0, 50, 400)
+
+    double = kWeights(kIndices, eigenvectors, 50, np.float64)
+    single = kWeights(kIndices, eigenvectors, 50, np.float32)
+
+    assert single.dtype == np.float32
+    assert relativeError(single, double) < TOLERANCE
+    assert np.allclose(double.sum(axis = 1), np.sum(np.abs(eigenvectors) ** 2, axis = 1))
+
+
+
+def test_overlaps():
+    rng = np.random.default_rng(3)
+    table = np.column_stack((np.repeat(np.arange(20), 4), np.tile([1, 2, 1, 2], 20), np.tile([3, 3, 4, 4], 20)))
+    vectors1 = rng.normal(size = (5, 80)) + 1j * rng.normal(size = (5, 80))
+    vectors2 = rng.normal(size = (5, 80)) + 1j * rng.normal(size = (5, 80))
+
+    double = overlapMatrix(table, vectors1, table, vectors2)
+    single = overlapMatrix(table, vectors1.astype(np.complex64), table, vectors2.astype(np.complex64))
+
+    assert single.dtype == np.float32
+    assert relativeError(single, double) < TOLERANCE
+
+
+
+def test_band_weights_chunks():
+    rng = np.random.default_rng(5)
+    eigenvectors = rng.normal(size = (4, 1000)) + 1j * rng.normal(size = (4, 1000))
+    kIndices = rng.integers(0, 30, 1000)
+
+    # Chunks splitting the transitions of a k-point add up to the same weights
+    assert np.allclose(kWeights(kIndices, eigenvectors, 30, np.float64, maxElements = 4 * 37), kWeights(kIndices, eigenvectors, 30, np.float64))
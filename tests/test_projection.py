@@ -0,0 +1,96 @@
+from projection import expandBySymmetry, CollinearProjector
+import numpy as np
+
+
+
+# Hexagonal lattice with a = 1, the reciprocal vectors at 60 degrees
+RLAT = np.array([[1.0, 1.0 / np.sqrt(3.0), 0.0], [0.0, 2.0 / np.sqrt(3.0), 0.0], [0.0, 0.0, 0.2]])
+
+
+
+def c6v():
+    # Rotations by multiples of 60 degrees about z, and the same followed by the mirror y -> -y
+    operations = []
+    for n in range(6):
+        c, s = np.cos(n * np.pi / 3), np.sin(n * np.pi / 3)
+        rotation = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+        operations += [rotation, rotation @ np.diag([1.0, -1.0, 1.0])]
+    return np.array(operations)
+
+
+
+def gmkgPath():
+    # Gamma - M - K - Gamma in cartesian coordinates, with distances along the path
+    points = np.array([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0], [1.0 / 3.0, 1.0 / 3.0, 0.0], [0.0, 0.0, 0.0]]) @ RLAT
+    distances = np.r_[0.0, np.cumsum(np.linalg.norm(np.diff(points, axis = 0), axis = 1))]
+    return points, distances
+
+
+
+def irreducibleGrid(n, symCar):
+    # One point per star of the n x n Gamma-centered grid, stored in reduced coordinates within [0, 1), mostly outside the first zone
+    red = np.array([[i / n, j / n, 0.0] for i in reversed(range(n)) for j in reversed(range(n))])
+    symRed = np.einsum('ij,sjk,kl->sil', RLAT, symCar, np.linalg.inv(RLAT))
+    seen = set()
+    points = []
+
+    for point in red:
+        key = tuple(np.round(point * n).astype(int) % n)
+        if key in seen:
+            continue
+        points.append(point)
+
+        for image in np.concatenate((point @ symRed, -(point @ symRed))):
+            seen.add(tuple(np.round(image * n).astype(int) % n))
+
+    return np.array(points) @ RLAT
+
+
+
+def bruteForce(carPoints, symCar, pathPoints, pathDistances, tolerance = 1e-6):
+    # Every symmetry image of every point, shifted by every nearby reciprocal lattice vector, tested against every segment
+    points, owners = expandBySymmetry(carPoints, symCar)
+    shifts = np.array([i * RLAT[0] + j * RLAT[1] for i in range(-2, 3) for j in range(-2, 3)])
+    found = set()
+
+    for point, owner in zip(points, owners):
+        for shift in shifts:
+            image = point + shift
+            for s in range(len(pathPoints) - 1):
+                direction = pathPoints[s + 1] - pathPoints[s]
+                t = (image - pathPoints[s]) @ direction / (direction @ direction)
+                if -tolerance <= t <= 1.0 + tolerance and np.linalg.norm(image - pathPoints[s] - t * direction) < tolerance:
+                    found.add((int(owner), round(pathDistances[s] + np.clip(t, 0.0, 1.0) * (pathDistances[s + 1] - pathDistances[s]), 6)))
+
+    return found
+
+
+
+def test_expand_by_symmetry():
+    points, owners = expandBySymmetry([[0.1, 0.0, 0.0], [0.0, 0.2, 0.0]], c6v())
+
+    assert points.shape == (48, 3)
+    assert owners.tolist() == [0] * 24 + [1] * 24
+    assert np.allclose(np.linalg.norm(points, axis = 1), np.repeat([0.1, 0.2], 24))
+
+
+
+def test_projection_matches_brute_force():
+    symCar = c6v()
+    carPoints = irreducibleGrid(6, symCar)
+    pathPoints, pathDistances = gmkgPath()
+
+    projector = CollinearProjector(symCar, RLAT)
+    projector.setPoints(carPoints)
+    points, owners, distances = projector.project(pathPoints, pathDistances)
+
+    expected = bruteForce(carPoints, symCar, pathPoints, pathDistances)
+
+    # Gamma at both ends, and points stored outside the first zone through their periodic images
+    assert {(int(o), round(d, 6)) for o, d in zip(owners, distances)} == expected
+    assert len(owners) == len(expected)
+    assert np.all(np.diff(distances) >= 0)
+
+    # Every projected point lies on the path
+    assert np.allclose(points, np.column_stack([np.interp(distances, pathDistances, pathPoints[:, i]) for i in range(3)]), atol = 1e-9)
+    assert 0 < len({int(o) for o in owners}) < len(carPoints)
@@ -0,0 +1,46 @@
+from PySide6.QtCore import QCoreApplication
+from render_queue import RenderQueue
+import pytest
+
+
+
+@pytest.fixture(scope = 'module')
+def application():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+
+def test_latest_data_drawn_once(application):
+    queue = RenderQueue()
+    drawn = []
+
+    queue.schedule('plot', drawn.append, 1)
+    queue.schedule('plot', drawn.append, 2)
+    queue.flush()
+
+    assert drawn == [2]
+    assert (queue.requests['plot'], queue.replots['plot']) == (2, 1)
+
+
+
+def test_failing_widget_keeps_other_replots(application):
+    queue = RenderQueue()
+    drawn = []
+
+    def fail(value):
+        raise RuntimeError(value)
+
+    queue.schedule('first', drawn.append, 1)
+    queue.schedule('broken', fail, 2)
+    queue.schedule('last', drawn.append, 3)
+
+    with pytest.raises(RuntimeError):
+        queue.flush()
+
+    # The replot after the failing one is still pending, and runs on the next turn
+    assert drawn == [1]
+    assert list(queue.dirty.keys()) == ['last']
+    assert queue.timer.isActive()
+
+    queue.flush()
+    assert drawn == [1, 3]
@@ -0,0 +1,61 @@
+from spectra import broadenSpectrum, gaussian, voigt, gaussianResponse, voigtResponse, lorentzianResponse
+import numpy as np
+
+
+
+def excitons(numExcitons = 300, seed = 0):
+    rng = np.random.default_rng(seed)
+    energies = np.sort(rng.uniform(1.0, 6.0, numExcitons))
+    strengths = rng.normal(size = numExcitons) + 1j * rng.normal(size = numExcitons)
+    return energies, strengths
+
+
+
+def test_response_parts():
+    x = np.linspace(-2.0, 2.0, 101)
+
+    for response, profile in ((gaussianResponse, gaussian), (voigtResponse, voigt)):
+        absorptive, dispersive = response(x, 0.1)
+        assert np.allclose(absorptive, np.pi * profile(x, 0.1))
+
+        # Far from the peak every response tends to -1 / x
+        assert np.allclose(response(np.array([50.0]), 0.1)[1], -1.0 / 50.0, rtol = 1.0e-3)
+
+    absorptive, dispersive = lorentzianResponse(x, 0.1)
+    assert np.allclose(dispersive + 1j * absorptive, -1.0 / (x + 0.1j))
+
+
+
+def test_lorentzian_matches_green_function():
+    # Im of sum s [-1 / (w - E + i eta) + 1 / (w + E + i eta)], what get_chi computes before its cofactor
+    energies, strengths = excitons()
+    grid = np.arange(0.0, 8.0, 0.01)
+
+    exact = np.sum(strengths[np.newaxis, :] * (-1.0 / (grid[:, np.newaxis] - energies + 0.1j) + 1.0 / (grid[:, np.newaxis] + energies + 0.1j)), axis = 1).imag
+
+    for cutoff in (8.0, 20.0, np.inf):
+        spectrum = broadenSpectrum(np.r_[energies, -energies], np.r_[strengths, -strengths], grid, 0.1, 'Lorentzian', cutoff, response = True)
+        assert np.max(np.abs(spectrum - exact)) < 1.0e-4 * np.max(np.abs(exact))
+
+
+
+def test_cutoff_keeps_far_tails():
+    energies, strengths = excitons(seed = 1)
+    grid = np.arange(0.0, 8.0, 0.01)
+
+    for profile in ('Gaussian', 'Voigt'):
+        full = broadenSpectrum(energies, strengths, grid, 0.1, profile, np.inf, response = True)
+        cut = broadenSpectrum(energies, strengths, grid, 0.1, profile, 8.0, response = True)
+        assert np.max(np.abs(cut - full)) < 1.0e-3 * np.max(np.abs(full))
+
+
+
+def test_real_strengths():
+    energies, strengths = excitons(seed = 2)
+    grid = np.arange(0.0, 8.0, 0.01)
+
+    # Real strengths only see the absorptive part, pi times the plain broadened spectrum
+    for profile in ('Lorentzian', 'Gaussian', 'Voigt'):
+        plain = broadenSpectrum(energies, np.abs(strengths), grid, 0.1, profile, np.inf)
+        response = broadenSpectrum(energies, np.abs(strengths) + 0j, grid, 0.1, profile, np.inf, response = True)
+        assert np.allclose(response, np.pi * plain)
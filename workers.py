@@ -0,0 +1,65 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+from time import perf_counter
+
+
+class WorkerSignals(QObject):
+    progress = Signal(object, object)
+    finished = Signal(object, object)
+    failed = Signal(object, str)
+
+
+class Worker(QRunnable):
+    def __init__(self, key, function, *args, **kwargs):
+        super().__init__()
+
+        self.key = key
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+        self.signals = WorkerSignals()
+        self.cancelled = False
+        self.done = False
+
+        # Time spent computing, what the result would cost to compute again
+        self.seconds = 0.0
+
+        # Owned from Python so that cancelled workers can be kept alive until they return
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            if not self.cancelled:
+                self.work()
+        finally:
+            self.done = True
+
+    def work(self):
+        start = perf_counter()
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as error:
+            if not self.cancelled:
+                self.signals.failed.emit(self.key, str(error))
+        else:
+            self.seconds = perf_counter() - start
+            if not self.cancelled:
+                self.signals.finished.emit(self.key, result)
+
+
+class StreamWorker(Worker):
+    def work(self):
+        try:
+            for item in self.function(*self.args, **self.kwargs):
+                if self.cancelled:
+                    return
+                self.signals.progress.emit(self.key, item)
+        except Exception as error:
+            if not self.cancelled:
+                self.signals.failed.emit(self.key, str(error))
+        else:
+            if not self.cancelled:
+                self.signals.finished.emit(self.key, None)